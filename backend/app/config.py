@@ -35,6 +35,10 @@ class Settings(BaseSettings):
     frame_skip: int = 3  # Process every Nth frame for CPU optimization (higher = smoother)
     input_resolution: tuple = (1280, 720)  # Downscale input to this resolution
     
+    # --- OCR Settings ---
+    ocr_backend: str = "torch"  # "openvino" runs EasyOCR models through OpenVINO on CPU
+    ocr_quantize: bool = False  # int8 dynamic quantization of the recognizer (torch backend)
+    
     # --- Parking Violation Settings ---
     # Reduced defaults for demo sensitivity
     parking_duration_threshold: int = 10  # Seconds before parking violation (demo)
@@ -103,6 +103,10 @@ plate_history: Dict[int, Dict[str, Any]] = {}
 # OCR cooldown: track_id -> last_ocr_time
 ocr_cooldown: Dict[int, float] = {}
 
+# Background OCR batches: (future, detections), applied when finished
+_pending_ocr: List[Tuple[Any, List[Any]]] = []
+_ocr_in_flight: set = set()  # track_ids with a plate crop being read
+
 # Speed tracking: track_id -> {"prev_centroid", "prev_time", "speed", "is_speeding", "speed_pixels"}
 speed_history: Dict[int, Dict[str, Any]] = {}
 
@@ -248,17 +252,25 @@ _lane_weaving_service = None
 _behavior_service = None
 
 
+def _no_ocr(crops, vehicle_ids=None):
+    """OCR fallback: an already finished future with no plate texts."""
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result([None] * len(crops))
+    return future
+
+
 def get_ocr_service():
-    """Lazy load OCR service."""
+    """Lazy load OCR service (background batches: crops -> future of texts)."""
     global _ocr_service
     if _ocr_service is None:
         try:
-            from app.services.ocr_service import read_plate
-            _ocr_service = read_plate
+            from app.services.ocr_service import submit_plates_batch
+            _ocr_service = submit_plates_batch
             print("✅ OCR service loaded")
         except ImportError as e:
             print(f"⚠️ OCR service not available: {e}")
-            _ocr_service = lambda x: None
+            _ocr_service = _no_ocr
     return _ocr_service
 
 
@@ -375,7 +387,8 @@ def trigger_emergency_if_detected(detections: list) -> dict:
         speak_warning(
             f"Emergency! {vehicle_type.title()} detected. Clearing North lane.",
             track_id=track_id,
-            warning_type="emergency"
+            warning_type="emergency",
+            urgent=True
         )
         
         print(f"[EMERGENCY] {vehicle_type.upper()} detected (Track ID: {track_id}) - North lane forced GREEN!")
@@ -402,7 +415,13 @@ def get_tts_service():
 # TTS WARNING FUNCTION
 # ============================================================================
 
-def speak_warning(message: str, track_id: int = None, warning_type: str = None):
+def speak_warning(
+    message: str,
+    track_id: int = None,
+    warning_type: str = None,
+    template: Optional[Tuple[str, str]] = None,
+    urgent: bool = False
+):
     """
     Generate and play a voice warning dynamically.
     
@@ -410,6 +429,9 @@ def speak_warning(message: str, track_id: int = None, warning_type: str = None):
         message: The actual warning message to speak
         track_id: Vehicle track ID (for cooldown tracking)
         warning_type: Type of warning (for logging only)
+        template: Optional (template_key, value) from tts WARNING_TEMPLATES that
+                  renders message; only the value is then synthesized
+        urgent: Speak ahead of queued informational warnings (violations)
     
     Includes cooldown to prevent spam.
     """
@@ -432,7 +454,12 @@ def speak_warning(message: str, track_id: int = None, warning_type: str = None):
     if tts:
         try:
             # Generate and play the ACTUAL message (not cached files)
-            tts.generate_warning(message, play_immediately=True)
+            from app.tts.tts_service import PRIORITY_VIOLATION, PRIORITY_NORMAL
+            priority = PRIORITY_VIOLATION if urgent else PRIORITY_NORMAL
+            if template is not None:
+                tts.generate_template_warning(*template, play_immediately=True, priority=priority)
+            else:
+                tts.generate_warning(message, play_immediately=True, priority=priority)
         except Exception as e:
             print(f"[TTS] Error: {e}")
 
@@ -628,7 +655,9 @@ def check_parking_violation(
                 # TTS Violation announcement
                 speak_warning(
                     f"Violation recorded for {plate_display}. Fine has been issued.",
-                    track_id
+                    track_id,
+                    template=("parking_fine", plate_display),
+                    urgent=True
                 )
                 
         elif time_in_zone >= PARKING_WARNING_SECONDS:
@@ -639,7 +668,8 @@ def check_parking_violation(
                 plate_display = det.plate_text or entry.get("plate") or f"Vehicle {track_id}"
                 speak_warning(
                     f"{plate_display}, please move immediately. You are in a no parking zone.",
-                    track_id
+                    track_id,
+                    template=("parking_move", plate_display)
                 )
                 entry["warned"] = True
         else:
@@ -879,9 +909,16 @@ def detect_plates_in_crops(
     all_plates = []
     vehicle_plate_map = {}
     
-    read_plate = get_ocr_service()
+    # Plate crops needing OCR this frame, read in one background batch
+    ocr_crops = []
+    ocr_dets = []
+    
+    submit_ocr = get_ocr_service()
     current_time = time.time()
     
+    # Pick up plate texts from OCR batches submitted on earlier frames
+    _collect_ocr_results(current_time)
+    
     for det in vehicle_detections:
         vx1, vy1, vx2, vy2 = det.bbox
         
@@ -924,17 +961,12 @@ def detect_plates_in_crops(
                     if (current_time - last_ocr_time) < OCR_COOLDOWN_SECONDS:
                         should_run_ocr = False
                 
-                if should_run_ocr:
+                if should_run_ocr and track_id not in _ocr_in_flight:
                     plate_crop = vehicle_crop[py1:py2, px1:px2]
                     if plate_crop.size > 0:
-                        new_text = read_plate(plate_crop)
-                        if new_text:
-                            plate_text = new_text
-                            ocr_cooldown[track_id] = current_time
-                            
-                            # If this vehicle was speeding and now we have plate, penalize
-                            if det.is_speeding and track_id not in penalized_vehicles:
-                                _apply_speeding_penalty(track_id, plate_text, det.speed_kmh)
+                        # Copy: the frame is annotated while OCR is running
+                        ocr_crops.append(plate_crop.copy())
+                        ocr_dets.append(det)
                 
                 all_plates.append(plate_bbox)
                 vehicle_plate_map[track_id] = {"bbox": plate_bbox, "text": plate_text}
@@ -947,9 +979,49 @@ def detect_plates_in_crops(
                 }
                 break
     
+    # OCR all new plate crops of this frame in one batch, overlapping with
+    # the next frames' detection; results are applied by _collect_ocr_results
+    if ocr_crops:
+        track_ids = [det.track_id for det in ocr_dets]
+        _pending_ocr.append((submit_ocr(ocr_crops, track_ids), ocr_dets))
+        _ocr_in_flight.update(track_ids)
+    
     return all_plates, vehicle_plate_map
 
 
+def _collect_ocr_results(current_time: float):
+    """Apply finished background OCR batches to plate history."""
+    global _pending_ocr
+    
+    still_pending = []
+    for future, dets in _pending_ocr:
+        if not future.done():
+            still_pending.append((future, dets))
+            continue
+        
+        try:
+            texts = future.result()
+        except Exception as e:
+            print(f"⚠️ OCR batch failed: {e}")
+            texts = [None] * len(dets)
+        
+        for det, new_text in zip(dets, texts):
+            track_id = det.track_id
+            _ocr_in_flight.discard(track_id)
+            if not new_text:
+                continue
+            
+            if track_id in plate_history:
+                plate_history[track_id]["text"] = new_text
+            ocr_cooldown[track_id] = current_time
+            
+            # If this vehicle was speeding and now we have plate, penalize
+            if det.is_speeding and track_id not in penalized_vehicles:
+                _apply_speeding_penalty(track_id, new_text, det.speed_kmh)
+    
+    _pending_ocr = still_pending
+
+
 def update_plate_history(vehicle_detections: List[Detection]) -> Dict[int, Dict[str, Any]]:
     """Update plate history and return remembered plates."""
     global plate_history
@@ -1058,17 +1130,6 @@ def detect_and_track(
             det.is_penalized = True
             red_light_violations += 1
         
-        # ===== MEMBER 2: Lane Weaving Detection =====
-        if lane_service:
-            try:
-                weaving_event = lane_service.detect_lane_weaving(
-                    det.track_id, det.centroid, det.plate_text
-                )
-                if weaving_event:
-                    print(f"[MEMBER2] Lane weaving: Vehicle {det.track_id}")
-            except Exception as e:
-                pass  # Non-critical feature
-        
         # ===== MEMBER 4: Abnormal Behavior Detection =====
         if behavior_svc:
             try:
@@ -1081,6 +1142,20 @@ def detect_and_track(
             except Exception as e:
                 pass  # Non-critical feature
     
+    # ===== MEMBER 2: Lane Weaving Detection (all vehicles in one pass) =====
+    if lane_service and detections:
+        try:
+            weaving_events = lane_service.detect_lane_weaving_batch(
+                [det.track_id for det in detections],
+                [det.centroid for det in detections],
+                [det.plate_text for det in detections],
+                now=timestamp,
+            )
+            for weaving_event in weaving_events:
+                print(f"[MEMBER2] Lane weaving: Vehicle {weaving_event.vehicle_id}")
+        except Exception as e:
+            pass  # Non-critical feature
+    
     # Signal automation (4-way junction with emergency detection)
     vehicle_count = len(detections)
     signal_state, signal_duration = update_traffic_signal(vehicle_count, _frame_counter, detections)
@@ -1203,7 +1278,8 @@ def _apply_red_light_penalty(track_id: int, plate_text: str, speed: float):
     speak_warning(
         f"Red light violation detected! Vehicle {plate_text} ran a red light at {speed:.0f} kilometers per hour.",
         track_id=track_id,
-        warning_type="red_light"
+        warning_type="red_light",
+        urgent=True
     )
     
     if scoring["engine"] is None:
@@ -1510,6 +1586,8 @@ def reset_state():
     _prev_plate_boxes = []
     plate_history.clear()
     ocr_cooldown.clear()
+    _pending_ocr.clear()
+    _ocr_in_flight.clear()
     speed_history.clear()
     parking_tracker.clear()
     penalized_vehicles.clear()
@@ -4,6 +4,9 @@ Main entry point with health checks, SSE endpoints, and API routing
 """
 
 import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -28,6 +31,18 @@ from app.db.database import init_db
 
 settings = get_settings()
 
+# --- Logging ---
+# app.* loggers enqueue records; a background listener thread does the console I/O
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+
+_app_logger = logging.getLogger("app")
+_app_logger.setLevel(logging.INFO)
+_app_logger.addHandler(QueueHandler(_log_queue))
+_app_logger.propagate = False
+
 # --- Event Queue for SSE ---
 # Simple in-memory queue for broadcasting events to connected clients
 event_queue: asyncio.Queue = asyncio.Queue()
@@ -37,6 +52,7 @@ event_queue: asyncio.Queue = asyncio.Queue()
 async def lifespan(app: FastAPI):
     """Application lifespan manager - startup and shutdown events."""
     # Startup
+    _log_listener.start()
     print(f"🚦 {settings.app_name} v{settings.app_version} starting...")
     print(f"📁 Data directory: {settings.data_dir}")
     print(f"🎯 Vehicle model: {settings.vehicle_model}")
@@ -47,9 +63,28 @@ async def lifespan(app: FastAPI):
         print("✅ Database initialized")
     except Exception as e:
         print(f"⚠️ Database init failed: {e}")
+    # Start batched lane weaving event writer
+    try:
+        from app.services.lane_weaving_service import start_weaving_event_writer
+        start_weaving_event_writer()
+    except Exception as e:
+        print(f"⚠️ Weaving event writer not started: {e}")
     yield
     # Shutdown
     print("🛑 Shutting down...")
+    # Flush pending lane weaving events
+    try:
+        from app.services.lane_weaving_service import stop_weaving_event_writer, close_db
+        await stop_weaving_event_writer()
+        await close_db()
+    except Exception as e:
+        print(f"⚠️ Weaving event writer shutdown failed: {e}")
+    # Stop background OCR workers
+    try:
+        from app.services.ocr_service import shutdown_ocr_executor
+        shutdown_ocr_executor(wait=False)
+    except Exception as e:
+        print(f"⚠️ OCR worker shutdown failed: {e}")
     # Clean up TTS audio files
     try:
         from app.tts import get_tts_service
@@ -58,6 +93,7 @@ async def lifespan(app: FastAPI):
             tts.cleanup_all_warnings()
     except:
         pass
+    _log_listener.stop()
 
 
 # --- FastAPI App ---
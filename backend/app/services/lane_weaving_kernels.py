@@ -0,0 +1,243 @@
+"""
+Member 2: Junction Safety - Lane Weaving Numeric Kernels
+IT22900890 - LiveSafeScore System
+
+Compiled hot-path helpers for lane_weaving_service. detect_lane_weaving runs
+once per tracked vehicle per frame, so the velocity/sign-change reduction is
+compiled with Numba when it is installed and falls back to NumPy otherwise.
+
+The kernels can also be compiled ahead of time into the _lane_weaving_aot
+extension, which is then used instead of the JIT (no compile at startup):
+
+    cd backend
+    python -m app.services.lane_weaving_kernels
+
+Kernels:
+    analyze_weaving(xs, head, count, window, min_move)
+        -> (avg_abs_velocity, direction_changes, last_sign)
+    analyze_weaving_rows(xs, heads, counts, rows, window, min_move)
+        -> same three values as arrays, one entry per requested row
+"""
+
+import os
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    from app.services import _lane_weaving_aot
+    AOT_AVAILABLE = True
+except ImportError:
+    AOT_AVAILABLE = False
+
+
+# Direction bits are packed into an int64, one per move
+MAX_WINDOW = 64
+
+
+# ============================================================================
+# PURE NUMPY FALLBACK
+# ============================================================================
+
+def _analyze_weaving_numpy(xs, head, count, window, min_move):
+    """NumPy implementation used when Numba is not installed."""
+    n = min(count, window)
+    if n < 2:
+        return 0.0, 0, 0
+    
+    cap = xs.shape[0]
+    ordered = xs[(head - n + np.arange(n)) % cap]
+    v = np.diff(ordered)
+    abs_v = np.abs(v)
+    
+    # Pack move directions (1 = right) into one int and count flips with popcount
+    moves = v[abs_v >= min_move] > 0
+    k = moves.size
+    bits = int.from_bytes(np.packbits(moves, bitorder='little').tobytes(), 'little')
+    changes = ((bits ^ (bits >> 1)) & ((1 << (k - 1)) - 1)).bit_count() if k > 1 else 0
+    last_sign = (1 if moves[-1] else -1) if k else 0
+    
+    return float(abs_v.mean()), changes, last_sign
+
+
+def _analyze_weaving_rows_numpy(xs, heads, counts, rows, window, min_move):
+    """
+    Vectorized analysis of many ring-buffer rows at once.
+    
+    Builds an (N, window) matrix of the most recent samples per row and
+    reduces along axis=1; samples older than a row's count are masked out.
+    """
+    cap = xs.shape[1]
+    n = np.minimum(counts[rows], window)
+    
+    cols = (heads[rows, None] - window + np.arange(window)) % cap
+    v = np.diff(xs[rows[:, None], cols], axis=1)
+    valid = np.arange(window - 1) >= (window - n)[:, None]
+    
+    # One |v| array, zeroed outside each row's window, feeds both the mean
+    # and the jitter filter
+    abs_v = np.abs(v)
+    abs_v[~valid] = 0
+    avg = abs_v.sum(axis=1) / np.maximum(n - 1, 1)
+    avg[n < 2] = 0.0
+    
+    sig = np.where(valid & (abs_v >= min_move), np.sign(v), 0)
+    
+    # Forward-fill the last non-zero sign so skipped moves don't break runs
+    pos = np.where(sig != 0, np.arange(window - 1), 0)
+    np.maximum.accumulate(pos, axis=1, out=pos)
+    filled = np.take_along_axis(sig, pos, axis=1)
+    
+    flips = (sig[:, 1:] != 0) & (filled[:, :-1] != 0) & (sig[:, 1:] != filled[:, :-1])
+    changes = np.count_nonzero(flips, axis=1)
+    
+    return avg, changes, filled[:, -1].astype(np.int64)
+
+
+# ============================================================================
+# NUMBA KERNEL
+# ============================================================================
+
+def _popcount64(x):
+    """SWAR population count of a non-negative int64."""
+    x = x - ((x >> 1) & 0x5555555555555555)
+    x = (x & 0x3333333333333333) + ((x >> 2) & 0x3333333333333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F0F0F0F0F
+    x = x + (x >> 8)
+    x = x + (x >> 16)
+    x = x + (x >> 32)
+    return x & 0x7F
+
+
+if NUMBA_AVAILABLE:
+    _popcount64 = njit(cache=True)(_popcount64)
+
+
+def _analyze_weaving_loop(xs, head, count, window, min_move):
+    """
+    Walk the ring buffer oldest-to-newest in a single pass.
+    
+    Move directions are packed one bit per counted move (1 = right), so
+    direction changes are the set bits of bits ^ (bits >> 1) below the
+    last move. At most MAX_WINDOW samples are analyzed to fit in an int64.
+    
+    Args:
+        xs: Ring buffer of x positions
+        head: Index of the next write slot in xs
+        count: Number of valid samples in xs
+        window: Number of most recent samples to analyze
+        min_move: Minimum |dx| counted as a directional move
+    
+    Returns:
+        (average |dx|, direction changes, sign of the last counted move)
+    """
+    n = min(count, window, MAX_WINDOW)
+    if n < 2:
+        return 0.0, 0, 0
+    
+    cap = xs.shape[0]
+    idx = (head - n) % cap
+    prev = xs[idx]
+    
+    total = 0.0
+    bits = 0
+    k = 0
+    for _ in range(n - 1):
+        idx += 1
+        if idx == cap:
+            idx = 0
+        cur = xs[idx]
+        v = cur - prev
+        prev = cur
+        
+        a = abs(v)
+        total += a
+        if a >= min_move:
+            bits |= (v > 0) << k
+            k += 1
+    
+    if k == 0:
+        return total / (n - 1), 0, 0
+    
+    changes = 0
+    if k > 1:
+        changes = _popcount64((bits ^ (bits >> 1)) & ((1 << (k - 1)) - 1))
+    last_sign = 1 if (bits >> (k - 1)) & 1 else -1
+    
+    return total / (n - 1), changes, last_sign
+
+
+if NUMBA_AVAILABLE:
+    _analyze_weaving_jit = njit(cache=True, fastmath=True)(_analyze_weaving_loop)
+    analyze_weaving = _analyze_weaving_jit
+else:
+    analyze_weaving = _analyze_weaving_numpy
+
+
+def _analyze_weaving_rows_loop(xs, heads, counts, rows, window, min_move):
+    """Run analyze_weaving over each requested row of a 2-D ring buffer."""
+    n = rows.shape[0]
+    avg = np.zeros(n, dtype=np.float64)
+    changes = np.zeros(n, dtype=np.int64)
+    last_sign = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        r = rows[i]
+        avg[i], changes[i], last_sign[i] = _analyze_weaving_jit(
+            xs[r], heads[r], counts[r], window, min_move
+        )
+    return avg, changes, last_sign
+
+
+if NUMBA_AVAILABLE:
+    analyze_weaving_rows = njit(cache=True, fastmath=True)(_analyze_weaving_rows_loop)
+else:
+    analyze_weaving_rows = _analyze_weaving_rows_numpy
+
+
+def _warmup():
+    """Compile (or load from cache) the kernels at import, not on the first frame."""
+    xs = np.zeros((1, 4), dtype=np.int16)
+    idx = np.zeros(1, dtype=np.int64)
+    analyze_weaving(xs[0], 0, 4, 4, 2)
+    analyze_weaving_rows(xs, idx, idx, idx, 4, 2)
+
+
+if AOT_AVAILABLE:
+    analyze_weaving = _lane_weaving_aot.analyze_weaving
+    analyze_weaving_rows = _lane_weaving_aot.analyze_weaving_rows
+elif NUMBA_AVAILABLE:
+    _warmup()
+
+
+# ============================================================================
+# AHEAD-OF-TIME BUILD
+# ============================================================================
+
+# Signatures match the track history arrays in lane_weaving_service
+AOT_SIGNATURES = {
+    'analyze_weaving': 'Tuple((f8, i8, i8))(i2[:], i8, i8, i8, i8)',
+    'analyze_weaving_rows': 'Tuple((f8[:], i8[:], i8[:]))(i2[:, :], i8[:], i8[:], i8[:], i8, i8)',
+}
+
+
+def build_aot():
+    """Compile the kernels into _lane_weaving_aot next to this file."""
+    from numba.pycc import CC
+    
+    cc = CC('_lane_weaving_aot')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export('analyze_weaving', AOT_SIGNATURES['analyze_weaving'])(_analyze_weaving_loop)
+    cc.export('analyze_weaving_rows', AOT_SIGNATURES['analyze_weaving_rows'])(_analyze_weaving_rows_loop)
+    cc.compile()
+    return cc.output_dir
+
+
+if __name__ == "__main__":
+    if not NUMBA_AVAILABLE:
+        raise SystemExit("numba is required to build the AOT kernels")
+    print(f"Built _lane_weaving_aot in {build_aot()}")
@@ -13,11 +13,21 @@ Formula:
 """
 
 import time
+import heapq
+import asyncio
+import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Optional
+from typing import Deque, Dict, List, Tuple, Optional, Sequence
 from collections import deque
+from itertools import islice
 from datetime import datetime
 
+import numpy as np
+
+from app.services.lane_weaving_kernels import analyze_weaving_rows
+
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # CONFIGURATION
@@ -27,9 +37,19 @@ from datetime import datetime
 X_VELOCITY_THRESHOLD = 15.0  # pixels per frame for significant lateral movement
 DIRECTION_CHANGES_THRESHOLD = 3  # minimum direction changes to detect weaving
 WEAVING_WINDOW_FRAMES = 30  # frames to analyze for weaving pattern
+MIN_LATERAL_MOVE = 2  # pixels; smaller x movements are ignored as jitter
+TRACK_HISTORY_FRAMES = 60  # positions kept per vehicle
 
 # Wrong-way detection (requires known lane directions)
 WRONG_WAY_ANGLE_THRESHOLD = 120  # degrees from expected direction
+WRONG_WAY_MIN_FRAMES = 5  # positions needed before judging direction
+WRONG_WAY_LOOKBACK_FRAMES = 10  # direction is measured over this many frames
+
+# Travel directions encoded as ints: opposite of id i is _OPPOSITE_ID[i]
+_DIR_ID = {'up': 0, 'down': 1, 'left': 2, 'right': 3}
+_DIR_NAME = ('up', 'down', 'left', 'right')
+_OPPOSITE_ID = (1, 0, 3, 2)
+_OPPOSITE_ID_ARR = np.array(_OPPOSITE_ID, dtype=np.int64)
 
 # Junction safety scoring
 INITIAL_SAFETY_SCORE = 100
@@ -42,50 +62,98 @@ VIOLATION_PENALTIES = {
     'tailgating': 3,             # -3 points per incident
 }
 SCORE_DECAY_RATE = 0.1  # Score recovery per second
+SCORE_DECAY_MIN_INTERVAL = 0.1  # seconds; reads more often than this reuse the score
+MAX_WEAVING_EVENTS = 1000  # most recent weaving events kept in memory
 MIN_SAFETY_SCORE = 0
 MAX_SAFETY_SCORE = 100
 
+# Safety level per whole score point: DANGER <40, WARNING <60, CAUTION <80, SAFE
+_SAFETY_LEVELS = ('DANGER',) * 40 + ('WARNING',) * 20 + ('CAUTION',) * 20 + ('SAFE',) * 21
+
 
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class VehicleTrack:
-    """Tracks a vehicle's position history for behavior analysis."""
+    """
+    Tracks a vehicle's position history for behavior analysis.
+    
+    Positions live in the module-level structure-of-arrays buffers; the
+    track only holds its row index into them.
+    """
     track_id: int
-    positions: deque = field(default_factory=lambda: deque(maxlen=60))
-    timestamps: deque = field(default_factory=lambda: deque(maxlen=60))
-    is_weaving: bool = False
+    row: int = -1
     is_wrong_way: bool = False
-    weaving_score: float = 0.0
     last_direction: Optional[str] = None  # 'left', 'right', None
-    direction_changes: int = 0
+    
+    @property
+    def head(self) -> int:
+        return int(_track_heads[self.row])
+    
+    @property
+    def count(self) -> int:
+        return int(_track_counts[self.row])
+    
+    @property
+    def positions(self) -> List[Tuple[int, int]]:
+        """Position history, oldest first."""
+        order = self._order()
+        return list(zip(_track_xs[self.row, order].tolist(), _track_ys[self.row, order].tolist()))
+    
+    @property
+    def timestamps(self) -> List[float]:
+        """Sample timestamps, oldest first."""
+        return _track_ts[self.row, self._order()].tolist()
+    
+    @property
+    def last_seen(self) -> Optional[float]:
+        """Timestamp of the newest sample, None if the track is empty."""
+        if self.count == 0:
+            return None
+        return float(_track_ts[self.row, (self.head - 1) % TRACK_HISTORY_FRAMES])
+    
+    @property
+    def is_weaving(self) -> bool:
+        return bool(_track_is_weaving[self.row])
+    
+    @property
+    def weaving_score(self) -> float:
+        return float(_track_weaving_scores[self.row])
+    
+    @property
+    def direction_changes(self) -> int:
+        return int(_track_direction_changes[self.row])
+    
+    def _order(self) -> np.ndarray:
+        """Ring-buffer column indices from oldest to newest sample."""
+        n = self.count
+        return (self.head - n + np.arange(n)) % TRACK_HISTORY_FRAMES
     
     def add_position(self, x: int, y: int, timestamp: float = None):
         """Add a new position to the track."""
         if timestamp is None:
-            timestamp = time.time()
-        self.positions.append((x, y))
-        self.timestamps.append(timestamp)
+            timestamp = _frame_now or time.time()
+        head = _track_heads[self.row]
+        _track_xs[self.row, head] = x
+        _track_ys[self.row, head] = y
+        _track_ts[self.row, head] = timestamp
+        _track_heads[self.row] = (head + 1) % TRACK_HISTORY_FRAMES
+        if _track_counts[self.row] < TRACK_HISTORY_FRAMES:
+            _track_counts[self.row] += 1
     
     def get_x_velocities(self, window: int = None) -> List[float]:
         """Calculate x-axis velocities over recent positions."""
-        if len(self.positions) < 2:
+        if self.count < 2:
             return []
         
         window = window or WEAVING_WINDOW_FRAMES
-        positions = list(self.positions)[-window:]
-        
-        velocities = []
-        for i in range(1, len(positions)):
-            x_vel = positions[i][0] - positions[i-1][0]
-            velocities.append(x_vel)
-        
-        return velocities
+        xs = _track_xs[self.row, self._order()[-window:]]
+        return np.diff(xs).tolist()
 
 
-@dataclass
+@dataclass(slots=True)
 class WeavingEvent:
     """A detected lane weaving event."""
     vehicle_id: int
@@ -113,26 +181,78 @@ class JunctionSafety:
     safety_score: float = 100.0
     last_violation_type: Optional[str] = None
     last_violation_time: Optional[float] = None
-    violations_last_hour: int = 0
-    weaving_events: List[WeavingEvent] = field(default_factory=list)
+    weaving_events: Deque[WeavingEvent] = field(
+        default_factory=lambda: deque(maxlen=MAX_WEAVING_EVENTS)
+    )
+    _decay_from: Optional[float] = field(default=None, repr=False)
+    
+    # Rolling hour of violation counts, one bucket per minute
+    _violation_buckets: np.ndarray = field(
+        default_factory=lambda: np.zeros(60, dtype=np.int32), repr=False
+    )
+    _bucket_minute: int = field(default=0, repr=False)
+    
+    @property
+    def violations_last_hour(self) -> int:
+        self._advance_buckets(int(time.time() // 60))
+        return int(self._violation_buckets.sum())
+    
+    def _advance_buckets(self, minute: int):
+        """Zero the buckets of minutes that passed since the last update."""
+        gap = minute - self._bucket_minute
+        if gap <= 0:
+            return
+        if gap >= 60:
+            self._violation_buckets[:] = 0
+        else:
+            self._violation_buckets[np.arange(self._bucket_minute + 1, minute + 1) % 60] = 0
+        self._bucket_minute = minute
     
-    def apply_penalty(self, violation_type: str):
+    def apply_penalty(self, violation_type: str, now: Optional[float] = None):
         """Apply a penalty to the safety score."""
+        if now is None:
+            now = _frame_now or time.time()
+        self._recover(now)
+        
         penalty = VIOLATION_PENALTIES.get(violation_type, 10)
         self.safety_score = max(MIN_SAFETY_SCORE, self.safety_score - penalty)
         self.last_violation_type = violation_type
-        self.last_violation_time = time.time()
-        self.violations_last_hour += 1
-        print(f"[JUNCTION] ⚠️ Safety penalty: -{penalty} for {violation_type} → Score: {self.safety_score:.1f}")
-    
-    def update_decay(self):
-        """Apply score recovery over time."""
-        if self.last_violation_time:
-            elapsed = time.time() - self.last_violation_time
-            recovery = min(elapsed * SCORE_DECAY_RATE, MAX_SAFETY_SCORE - self.safety_score)
-            self.safety_score = min(MAX_SAFETY_SCORE, self.safety_score + recovery)
+        self.last_violation_time = now
+        # A stale frame clock can be behind the last decay credit; never rewind it
+        self._decay_from = max(self._decay_from or now, now)
+        
+        minute = int(now // 60)
+        self._advance_buckets(minute)
+        if self._bucket_minute - minute < 60:  # Ignore violations older than the window
+            self._violation_buckets[minute % 60] += 1
+        
+        logger.info("[JUNCTION] ⚠️ Safety penalty: -%s for %s → Score: %.1f",
+                    penalty, violation_type, self.safety_score)
+    
+    def _recover(self, now: float):
+        """Credit score recovery for the time since it was last applied."""
+        if self._decay_from is None or now <= self._decay_from:
+            return
+        recovery = (now - self._decay_from) * SCORE_DECAY_RATE
+        self.safety_score = min(MAX_SAFETY_SCORE, self.safety_score + recovery)
+        self._decay_from = now
+    
+    def update_decay(self, now: Optional[float] = None):
+        """
+        Apply score recovery over time.
+        
+        Only readers call this; it is skipped if the score was brought up
+        to date less than SCORE_DECAY_MIN_INTERVAL seconds ago.
+        """
+        if self._decay_from is None:
+            return
+        if now is None:
+            now = time.time()
+        if now - self._decay_from >= SCORE_DECAY_MIN_INTERVAL:
+            self._recover(now)
     
     def to_dict(self) -> dict:
+        self.update_decay()
         return {
             'junction_id': self.junction_id,
             'safety_score': round(self.safety_score, 1),
@@ -143,113 +263,229 @@ class JunctionSafety:
         }
     
     def get_safety_level(self) -> str:
-        if self.safety_score >= 80:
-            return 'SAFE'
-        elif self.safety_score >= 60:
-            return 'CAUTION'
-        elif self.safety_score >= 40:
-            return 'WARNING'
-        else:
-            return 'DANGER'
+        return _SAFETY_LEVELS[max(0, min(100, int(self.safety_score)))]
 
 
 # ============================================================================
 # GLOBAL STATE
 # ============================================================================
 
-# Vehicle tracks: track_id -> VehicleTrack
-_vehicle_tracks: Dict[int, VehicleTrack] = {}
+# Timestamp of the frame currently being processed (0.0 = not set)
+_frame_now: float = 0.0
+
+# Vehicle tracks: track_id -> VehicleTrack, split into shards by track_id so
+# each shard stays small and can later be processed independently
+_TRACK_SHARDS = 16  # power of two; shard = track_id & (_TRACK_SHARDS - 1)
+_track_shards: List[Dict[int, VehicleTrack]] = [{} for _ in range(_TRACK_SHARDS)]
+
+# Min-heap of (last seen time, track_id), one entry per track. Entries are
+# refreshed lazily by cleanup_old_tracks, so updates never touch the heap.
+_track_expiry: List[Tuple[float, int]] = []
+
+# Structure-of-arrays track history: one row per tracked vehicle, grown on demand.
+# Pixel coordinates fit in int16, keeping a 60-frame row of xs or ys at 120 bytes.
+_TRACK_ROWS_INITIAL = 64
+_track_xs = np.zeros((_TRACK_ROWS_INITIAL, TRACK_HISTORY_FRAMES), dtype=np.int16)
+_track_ys = np.zeros((_TRACK_ROWS_INITIAL, TRACK_HISTORY_FRAMES), dtype=np.int16)
+_track_ts = np.zeros((_TRACK_ROWS_INITIAL, TRACK_HISTORY_FRAMES), dtype=np.float64)
+_track_heads = np.zeros(_TRACK_ROWS_INITIAL, dtype=np.int64)
+_track_counts = np.zeros(_TRACK_ROWS_INITIAL, dtype=np.int64)
+
+# Latest weaving analysis per row
+_track_weaving_scores = np.zeros(_TRACK_ROWS_INITIAL, dtype=np.float64)
+_track_direction_changes = np.zeros(_TRACK_ROWS_INITIAL, dtype=np.int64)
+_track_is_weaving = np.zeros(_TRACK_ROWS_INITIAL, dtype=bool)
+
+_free_rows: List[int] = list(range(_TRACK_ROWS_INITIAL - 1, -1, -1))
 
 # Junction safety state
 _junction_safety: JunctionSafety = JunctionSafety()
 
 
+def set_frame_time(now: float):
+    """Set the timestamp shared by all per-vehicle updates of the current frame."""
+    global _frame_now
+    _frame_now = now
+
+
+def _grow_track_arrays():
+    """Double the row capacity of the track history arrays."""
+    global _track_xs, _track_ys, _track_ts, _track_heads, _track_counts
+    global _track_weaving_scores, _track_direction_changes, _track_is_weaving
+    
+    old_rows = _track_heads.shape[0]
+    
+    def grow(arr: np.ndarray) -> np.ndarray:
+        new = np.zeros((old_rows * 2,) + arr.shape[1:], dtype=arr.dtype)
+        new[:old_rows] = arr
+        return new
+    
+    _track_xs = grow(_track_xs)
+    _track_ys = grow(_track_ys)
+    _track_ts = grow(_track_ts)
+    _track_heads = grow(_track_heads)
+    _track_counts = grow(_track_counts)
+    _track_weaving_scores = grow(_track_weaving_scores)
+    _track_direction_changes = grow(_track_direction_changes)
+    _track_is_weaving = grow(_track_is_weaving)
+    _free_rows.extend(range(old_rows * 2 - 1, old_rows - 1, -1))
+
+
+def _shard(track_id: int) -> Dict[int, VehicleTrack]:
+    """Return the track shard owning track_id."""
+    return _track_shards[track_id & (_TRACK_SHARDS - 1)]
+
+
+def _new_track(track_id: int) -> VehicleTrack:
+    """Create a track and assign it a free history row."""
+    if not _free_rows:
+        _grow_track_arrays()
+    row = _free_rows.pop()
+    _track_heads[row] = 0
+    _track_counts[row] = 0
+    _track_weaving_scores[row] = 0.0
+    _track_direction_changes[row] = 0
+    _track_is_weaving[row] = False
+    
+    track = VehicleTrack(track_id=track_id, row=row)
+    _shard(track_id)[track_id] = track
+    heapq.heappush(_track_expiry, (_frame_now or time.time(), track_id))
+    return track
+
+
+def _remove_track(track_id: int):
+    """Drop a track and return its history row to the free list."""
+    track = _shard(track_id).pop(track_id, None)
+    if track is not None:
+        _free_rows.append(track.row)
+
+
 # ============================================================================
 # LANE WEAVING DETECTION
 # ============================================================================
 
-def detect_lane_weaving(
-    track_id: int,
-    centroid: Tuple[int, int],
-    plate_text: Optional[str] = None
-) -> Optional[WeavingEvent]:
+def detect_lane_weaving_batch(
+    track_ids: Sequence[int],
+    centroids: Sequence[Tuple[int, int]],
+    plate_texts: Optional[Sequence[Optional[str]]] = None,
+    now: Optional[float] = None
+) -> List[WeavingEvent]:
     """
-    Detect zig-zag/weaving movement by analyzing x-axis velocity changes.
+    Update every tracked vehicle in a frame and detect weaving in one pass.
+    
+    Positions are written into the structure-of-arrays history and the
+    velocity/sign-change analysis runs across all ready rows at once.
     
     Args:
-        track_id: Vehicle tracking ID
-        centroid: Current (x, y) position
-        plate_text: License plate if available
+        track_ids: Vehicle tracking IDs in this frame
+        centroids: Matching (x, y) positions, shape (N, 2)
+        plate_texts: Matching license plates (entries may be None)
+        now: Frame timestamp; becomes the shared frame time when given
     
     Returns:
-        WeavingEvent if weaving detected, None otherwise
+        WeavingEvents for vehicles first detected weaving in this frame
     """
-    global _vehicle_tracks, _junction_safety
+    global _junction_safety
     
-    # Get or create track
-    if track_id not in _vehicle_tracks:
-        _vehicle_tracks[track_id] = VehicleTrack(track_id=track_id)
+    ids = [int(t) for t in track_ids]
+    n = len(ids)
+    if n == 0:
+        return []
     
-    track = _vehicle_tracks[track_id]
-    track.add_position(centroid[0], centroid[1])
+    points = np.asarray(centroids, dtype=np.int16).reshape(n, 2)
+    if now is None:
+        now = _frame_now or time.time()
+    else:
+        set_frame_time(now)
+    
+    # Get or create tracks and resolve their history rows
+    rows = np.empty(n, dtype=np.int64)
+    for i, track_id in enumerate(ids):
+        track = _shard(track_id).get(track_id)
+        if track is None:
+            track = _new_track(track_id)
+        rows[i] = track.row
+    
+    # Append the new positions to every row's ring buffer
+    heads = _track_heads[rows]
+    _track_xs[rows, heads] = points[:, 0]
+    _track_ys[rows, heads] = points[:, 1]
+    _track_ts[rows, heads] = now
+    _track_heads[rows] = (heads + 1) % TRACK_HISTORY_FRAMES
+    counts = np.minimum(_track_counts[rows] + 1, TRACK_HISTORY_FRAMES)
+    _track_counts[rows] = counts
     
     # Need enough history to analyze
-    if len(track.positions) < WEAVING_WINDOW_FRAMES // 2:
-        return None
-    
-    # Calculate x-axis velocities
-    x_velocities = track.get_x_velocities(WEAVING_WINDOW_FRAMES)
-    if not x_velocities:
-        return None
-    
-    # Count direction changes
-    direction_changes = 0
-    prev_direction = None
-    
-    for x_vel in x_velocities:
-        if abs(x_vel) < 2:  # Ignore small movements
-            continue
-        
-        current_direction = 'left' if x_vel < 0 else 'right'
-        if prev_direction and current_direction != prev_direction:
-            direction_changes += 1
-        prev_direction = current_direction
-    
-    # Calculate average absolute x-velocity
-    avg_x_velocity = sum(abs(v) for v in x_velocities) / len(x_velocities)
+    ready = np.flatnonzero(counts >= WEAVING_WINDOW_FRAMES // 2)
+    if ready.size == 0:
+        return []
+    
+    ready_rows = rows[ready]
+    avg_x_velocity, direction_changes, last_sign = analyze_weaving_rows(
+        _track_xs, _track_heads, _track_counts, ready_rows,
+        WEAVING_WINDOW_FRAMES, MIN_LATERAL_MOVE
+    )
     
     # Detect weaving: high lateral velocity + multiple direction changes
     is_weaving = (
-        avg_x_velocity > X_VELOCITY_THRESHOLD and
-        direction_changes >= DIRECTION_CHANGES_THRESHOLD
+        (avg_x_velocity > X_VELOCITY_THRESHOLD) &
+        (direction_changes >= DIRECTION_CHANGES_THRESHOLD)
     )
     
-    track.is_weaving = is_weaving
-    track.direction_changes = direction_changes
-    track.weaving_score = avg_x_velocity
+    _track_weaving_scores[ready_rows] = avg_x_velocity
+    _track_direction_changes[ready_rows] = direction_changes
+    _track_is_weaving[ready_rows] = is_weaving
     
-    if is_weaving and not track.last_direction:  # First detection for this vehicle
-        track.last_direction = prev_direction
+    events = []
+    for j in np.flatnonzero(is_weaving):
+        i = ready[j]
+        track = _shard(ids[i])[ids[i]]
+        if track.last_direction:  # Already reported for this vehicle
+            continue
+        
+        track.last_direction = 'left' if last_sign[j] < 0 else 'right'
         
         # Create weaving event
         event = WeavingEvent(
-            vehicle_id=track_id,
-            plate_number=plate_text,
-            avg_x_velocity=avg_x_velocity,
-            direction_changes=direction_changes,
-            duration_frames=len(x_velocities),
+            vehicle_id=track.track_id,
+            plate_number=plate_texts[i] if plate_texts is not None else None,
+            avg_x_velocity=float(avg_x_velocity[j]),
+            direction_changes=int(direction_changes[j]),
+            duration_frames=int(min(counts[i], WEAVING_WINDOW_FRAMES)) - 1,
         )
         
         # Apply penalty to junction safety
-        _junction_safety.apply_penalty('lane_weaving')
+        _junction_safety.apply_penalty('lane_weaving', now)
         _junction_safety.weaving_events.append(event)
         
-        print(f"[WEAVING] 🚗 Vehicle {track_id} detected weaving! "
-              f"X-vel: {avg_x_velocity:.1f}, Changes: {direction_changes}")
+        logger.debug("[WEAVING] 🚗 Vehicle %s detected weaving! X-vel: %.1f, Changes: %s",
+                     track.track_id, event.avg_x_velocity, event.direction_changes)
         
-        return event
+        events.append(event)
+    
+    return events
+
+
+def detect_lane_weaving(
+    track_id: int,
+    centroid: Tuple[int, int],
+    plate_text: Optional[str] = None
+) -> Optional[WeavingEvent]:
+    """
+    Detect zig-zag/weaving movement by analyzing x-axis velocity changes.
     
-    return None
+    Single-vehicle wrapper around detect_lane_weaving_batch.
+    
+    Args:
+        track_id: Vehicle tracking ID
+        centroid: Current (x, y) position
+        plate_text: License plate if available
+    
+    Returns:
+        WeavingEvent if weaving detected, None otherwise
+    """
+    events = detect_lane_weaving_batch([track_id], [centroid], [plate_text])
+    return events[0] if events else None
 
 
 def detect_wrong_way(
@@ -270,49 +506,114 @@ def detect_wrong_way(
     Returns:
         True if wrong-way driving detected
     """
-    global _vehicle_tracks, _junction_safety
-    
-    if track_id not in _vehicle_tracks:
-        _vehicle_tracks[track_id] = VehicleTrack(track_id=track_id)
+    global _junction_safety
     
-    track = _vehicle_tracks[track_id]
+    track = _shard(track_id).get(track_id)
+    if track is None:
+        track = _new_track(track_id)
     
-    if len(track.positions) < 5:
+    if track.count < WRONG_WAY_MIN_FRAMES:
         return False
     
-    # Calculate movement direction
-    positions = list(track.positions)
-    start = positions[-10] if len(positions) >= 10 else positions[0]
-    end = positions[-1]
+    # Calculate movement direction straight from the ring buffer
+    row, head = track.row, track.head
+    end = (head - 1) % TRACK_HISTORY_FRAMES
+    start = (head - min(track.count, WRONG_WAY_LOOKBACK_FRAMES)) % TRACK_HISTORY_FRAMES
     
-    dx = end[0] - start[0]
-    dy = end[1] - start[1]
+    dx = int(_track_xs[row, end]) - int(_track_xs[row, start])
+    dy = int(_track_ys[row, end]) - int(_track_ys[row, start])
     
     # Determine actual direction
-    if abs(dy) > abs(dx):
-        actual_direction = 'down' if dy > 0 else 'up'
-    else:
-        actual_direction = 'right' if dx > 0 else 'left'
+    actual_id = (1 if dy > 0 else 0) if abs(dy) > abs(dx) else (3 if dx > 0 else 2)
     
     # Check if wrong way
-    opposite_directions = {
-        'up': 'down',
-        'down': 'up',
-        'left': 'right',
-        'right': 'left',
-    }
-    
-    is_wrong_way = (actual_direction == opposite_directions.get(expected_direction))
+    expected_id = _DIR_ID.get(expected_direction)
+    is_wrong_way = expected_id is not None and actual_id == _OPPOSITE_ID[expected_id]
     
     if is_wrong_way and not track.is_wrong_way:
         track.is_wrong_way = True
         _junction_safety.apply_penalty('wrong_way_driving')
-        print(f"[WRONG-WAY] ⚠️ Vehicle {track_id} going {actual_direction} in {expected_direction} lane!")
+        logger.info("[WRONG-WAY] ⚠️ Vehicle %s going %s in %s lane!",
+                    track_id, _DIR_NAME[actual_id], expected_direction)
         return True
     
     return False
 
 
+def detect_wrong_way_batch(
+    track_ids: Sequence[int],
+    expected_directions,
+    plate_texts: Optional[Sequence[Optional[str]]] = None
+) -> List[int]:
+    """
+    Wrong-way check for many tracks at once.
+    
+    Same rules as detect_wrong_way, but dx/dy over the last
+    WRONG_WAY_LOOKBACK_FRAMES samples are gathered straight from the
+    ring buffers for every track and classified in one pass.
+    
+    Args:
+        track_ids: Vehicle tracking IDs (positions already recorded)
+        expected_directions: One direction for all tracks, or one per track
+        plate_texts: License plates if available, aligned with track_ids
+    
+    Returns:
+        IDs of tracks newly flagged as wrong-way this call
+    """
+    global _junction_safety
+    
+    n = len(track_ids)
+    if n == 0:
+        return []
+    
+    if isinstance(expected_directions, str):
+        expected_directions = (expected_directions,) * n
+    
+    rows = np.empty(n, dtype=np.int64)
+    for i, track_id in enumerate(track_ids):
+        track = _shard(track_id).get(track_id)
+        if track is None:
+            track = _new_track(track_id)
+        rows[i] = track.row
+    expected = np.fromiter(
+        (_DIR_ID.get(d, -1) for d in expected_directions), dtype=np.int64, count=n
+    )
+    
+    # Newest sample and the one WRONG_WAY_LOOKBACK_FRAMES back (or the oldest)
+    cap = _track_xs.shape[1]
+    heads = _track_heads[rows]
+    counts = _track_counts[rows]
+    end = (heads - 1) % cap
+    start = (heads - np.minimum(counts, WRONG_WAY_LOOKBACK_FRAMES)) % cap
+    
+    dx = _track_xs[rows, end] - _track_xs[rows, start]
+    dy = _track_ys[rows, end] - _track_ys[rows, start]
+    
+    vert = np.abs(dy) > np.abs(dx)
+    dir_id = np.where(vert, np.where(dy > 0, 1, 0), np.where(dx > 0, 3, 2))
+    wrong = (
+        (counts >= WRONG_WAY_MIN_FRAMES)
+        & (expected >= 0)
+        & (dir_id == _OPPOSITE_ID_ARR[expected])
+    )
+    
+    flagged = []
+    for i in np.flatnonzero(wrong):
+        track_id = track_ids[i]
+        track = _shard(track_id)[track_id]
+        if track.is_wrong_way:
+            continue
+        track.is_wrong_way = True
+        _junction_safety.apply_penalty('wrong_way_driving')
+        plate = plate_texts[i] if plate_texts is not None else None
+        logger.info("[WRONG-WAY] ⚠️ Vehicle %s%s going %s in %s lane!",
+                    track_id, f" ({plate})" if plate else "",
+                    _DIR_NAME[dir_id[i]], expected_directions[i])
+        flagged.append(track_id)
+    
+    return flagged
+
+
 # ============================================================================
 # JUNCTION SAFETY API
 # ============================================================================
@@ -331,86 +632,182 @@ def get_safety_score() -> float:
 
 def reset_junction_safety():
     """Reset junction safety to initial state."""
-    global _junction_safety, _vehicle_tracks
+    global _junction_safety
     _junction_safety = JunctionSafety()
-    _vehicle_tracks.clear()
-    print("[JUNCTION] Safety score reset to 100")
+    for shard in _track_shards:
+        for track_id in list(shard):
+            _remove_track(track_id)
+    _track_expiry.clear()
+    logger.info("[JUNCTION] Safety score reset to 100")
 
 
 def get_recent_weaving_events(limit: int = 10) -> List[dict]:
     """Get recent lane weaving events."""
-    return [e.to_dict() for e in _junction_safety.weaving_events[-limit:]]
+    recent = list(islice(reversed(_junction_safety.weaving_events), limit))
+    return [e.to_dict() for e in reversed(recent)]
 
 
 def cleanup_old_tracks(max_age_seconds: float = 30.0):
-    """Remove old vehicle tracks that haven't been updated recently."""
-    global _vehicle_tracks
-    current_time = time.time()
-    stale_ids = []
+    """
+    Remove old vehicle tracks that haven't been updated recently.
     
-    for track_id, track in _vehicle_tracks.items():
-        if track.timestamps and (current_time - track.timestamps[-1]) > max_age_seconds:
-            stale_ids.append(track_id)
+    Only heap entries older than the cutoff are visited; a track seen since
+    its entry was pushed is re-queued at its latest timestamp instead.
+    """
+    cutoff = time.time() - max_age_seconds
     
-    for track_id in stale_ids:
-        del _vehicle_tracks[track_id]
+    while _track_expiry and _track_expiry[0][0] < cutoff:
+        queued_at, track_id = heapq.heappop(_track_expiry)
+        track = _shard(track_id).get(track_id)
+        if track is None:
+            continue
+        
+        last_seen = track.last_seen or queued_at
+        if last_seen < cutoff:
+            _remove_track(track_id)
+        else:
+            heapq.heappush(_track_expiry, (last_seen, track_id))
 
 
 # ============================================================================
 # DATABASE INTEGRATION
 # ============================================================================
 
-async def save_weaving_event_to_db(event: WeavingEvent):
-    """Save a lane weaving event to the database."""
-    try:
+# Weaving events are queued and written in batches by a background task
+WEAVING_FLUSH_MAX_EVENTS = 128
+WEAVING_FLUSH_INTERVAL = 0.5  # seconds to wait for more events before flushing
+
+_INSERT_WEAVING_EVENT_SQL = """
+    INSERT INTO lane_weaving_events 
+    (vehicle_id, plate_number, avg_x_velocity, direction_changes, duration_frames)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_pending_events: Optional[asyncio.Queue] = None
+_flush_task: Optional[asyncio.Task] = None
+
+# Shared aiosqlite connection, opened on first use and kept for the app lifetime
+_db = None
+
+
+def _get_db_path():
+    from app.config import get_settings
+    return get_settings().data_dir / "traffic.db"
+
+
+async def _get_db():
+    """Return the shared database connection, opening it in WAL mode if needed."""
+    global _db
+    if _db is None:
         import aiosqlite
-        from app.config import get_settings
         
-        settings = get_settings()
-        db_path = settings.data_dir / "traffic.db"
+        db = await aiosqlite.connect(_get_db_path())
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute("PRAGMA temp_store=MEMORY")
+        _db = db
+    return _db
+
+
+async def close_db():
+    """Close the shared database connection."""
+    global _db
+    if _db is not None:
+        db, _db = _db, None
+        await db.close()
+
+
+async def _drain_events(queue: asyncio.Queue, max_items: int, timeout: float) -> list:
+    """Wait for one item, then collect more until max_items or timeout."""
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + timeout
+    
+    while len(batch) < max_items and batch[-1] is not None:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    
+    return batch
+
+
+async def _write_weaving_events(events: List[WeavingEvent]):
+    """Insert a batch of weaving events in a single transaction."""
+    rows = [
+        (e.vehicle_id, e.plate_number, e.avg_x_velocity, e.direction_changes, e.duration_frames)
+        for e in events
+    ]
+    db = await _get_db()
+    await db.executemany(_INSERT_WEAVING_EVENT_SQL, rows)
+    await db.commit()
+    logger.debug("[DB] Saved %d weaving event(s)", len(rows))
+
+
+async def _weaving_flush_loop(queue: asyncio.Queue):
+    """Background writer: flush queued events every N events or T seconds."""
+    while True:
+        batch = await _drain_events(queue, WEAVING_FLUSH_MAX_EVENTS, WEAVING_FLUSH_INTERVAL)
+        events = [e for e in batch if e is not None]
         
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute("""
-                INSERT INTO lane_weaving_events 
-                (vehicle_id, plate_number, avg_x_velocity, direction_changes, duration_frames)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                event.vehicle_id,
-                event.plate_number,
-                event.avg_x_velocity,
-                event.direction_changes,
-                event.duration_frames,
-            ))
-            await db.commit()
-            print(f"[DB] Saved weaving event for vehicle {event.vehicle_id}")
-    except Exception as e:
-        print(f"[DB] Error saving weaving event: {e}")
+        if events:
+            try:
+                await _write_weaving_events(events)
+            except Exception as e:
+                logger.error("[DB] Error saving weaving events: %s", e)
+        
+        if len(events) != len(batch):  # Stop sentinel received
+            return
+
+
+def start_weaving_event_writer():
+    """Start the background weaving event writer (call from a running event loop)."""
+    global _pending_events, _flush_task
+    if _flush_task is None or _flush_task.done():
+        _pending_events = asyncio.Queue()
+        _flush_task = asyncio.create_task(_weaving_flush_loop(_pending_events))
+
+
+async def stop_weaving_event_writer():
+    """Flush any queued weaving events and stop the writer."""
+    global _flush_task
+    if _flush_task is None:
+        return
+    if not _flush_task.done():
+        await _pending_events.put(None)
+        await _flush_task
+    _flush_task = None
+
+
+async def save_weaving_event_to_db(event: WeavingEvent):
+    """Queue a lane weaving event for the next batched database write."""
+    if _flush_task is None or _flush_task.done():
+        start_weaving_event_writer()
+    await _pending_events.put(event)
 
 
 async def update_junction_safety_in_db():
     """Update junction safety score in database."""
     try:
-        import aiosqlite
-        from app.config import get_settings
-        
-        settings = get_settings()
-        db_path = settings.data_dir / "traffic.db"
         safety = get_junction_safety()
         
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute("""
-                INSERT OR REPLACE INTO junction_safety 
-                (id, junction_id, safety_score, last_violation_type, violations_last_hour, updated_at)
-                VALUES (1, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                safety.junction_id,
-                safety.safety_score,
-                safety.last_violation_type,
-                safety.violations_last_hour,
-            ))
-            await db.commit()
+        db = await _get_db()
+        await db.execute("""
+            INSERT OR REPLACE INTO junction_safety 
+            (id, junction_id, safety_score, last_violation_type, violations_last_hour, updated_at)
+            VALUES (1, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            safety.junction_id,
+            safety.safety_score,
+            safety.last_violation_type,
+            safety.violations_last_hour,
+        ))
+        await db.commit()
     except Exception as e:
-        print(f"[DB] Error updating junction safety: {e}")
+        logger.error("[DB] Error updating junction safety: %s", e)
 
 
 # ============================================================================
@@ -418,6 +815,8 @@ async def update_junction_safety_in_db():
 # ============================================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     print("=" * 60)
     print("Lane Weaving Detection Test")
     print("=" * 60)
@@ -7,22 +7,91 @@ Includes regex validation and filtering for realistic plate text.
 """
 
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Tuple, List
 import cv2
 import numpy as np
 
 # Lazy load EasyOCR to avoid slow startup
 _ocr_reader = None
+_ocr_reader_lock = threading.Lock()
+
+# Background OCR workers (EasyOCR/OpenCV release the GIL while running)
+OCR_WORKERS = 2
+_ocr_executor: Optional[ThreadPoolExecutor] = None
+
+# Batched OCR: crops are letterboxed to one shape so a frame's plates run as one batch
+OCR_BATCH_WIDTH = 200
+OCR_BATCH_HEIGHT = 64
+OCR_BATCH_SIZE = 8
+
+# EasyOCR recognizes at 64 px height; taller crops only cost detector time
+OCR_TARGET_HEIGHT = 64
+OCR_MAX_CROP_HEIGHT = 96  # crops above this are downscaled to OCR_TARGET_HEIGHT
+
+# OCR result cache keyed by (vehicle_id, 64-bit dHash of the crop), LRU order
+OCR_CACHE_SIZE = 4096
+_ocr_cache: "OrderedDict[Tuple[Optional[int], int], Optional[str]]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+# Plate text regexes, compiled once at import
+_CLEAN_RE = re.compile(r'[^A-Z0-9\-\s]')
+_SPACE_RE = re.compile(r'\s+')
+
+# Byte classification tables: translate() maps A-Z (resp. 0-9) to 1, else 0
+_IS_UPPER = bytes(1 if 65 <= i <= 90 else 0 for i in range(256))
+_IS_DIGIT = bytes(1 if 48 <= i <= 57 else 0 for i in range(256))
+
+# Sri Lankan plate patterns (flexible matching)
+_PLATE_PATTERNS = (
+    # Province code + letters + hyphen + numbers: WP ABC-1234
+    r'^[A-Z]{2,3}\s?[A-Z]{1,4}[\-\s]?\d{4}$',
+    
+    # Province code + letters + numbers (no hyphen): WP CAB1234
+    r'^[A-Z]{2,3}\s?[A-Z]{1,4}\d{4}$',
+    
+    # Old format with hyphen: 123-4567 or 12-3456
+    r'^\d{2,3}[\-\s]?\d{4}$',
+    
+    # Bike/motorbike format: WP AB-1234
+    r'^[A-Z]{2}\s?[A-Z]{2}[\-\s]?\d{4}$',
+    
+    # Partial matches (at least 2 letters followed by digits)
+    r'^[A-Z]{2,}\s?[\-]?\s?\d{3,}$',
+    
+    # Generic: starts with letters, ends with numbers
+    r'^[A-Z]+.*\d{3,}$',
+)
+
+# All formats as one anchored alternation, so a candidate is matched once
+_PLATE_RE = re.compile('^(?:' + '|'.join(p[1:-1] for p in _PLATE_PATTERNS) + ')$')
 
 
 def get_ocr_reader():
     """Get or initialize the EasyOCR reader (lazy loading)."""
     global _ocr_reader
-    if _ocr_reader is None:
+    if _ocr_reader is not None:
+        return _ocr_reader
+    
+    with _ocr_reader_lock:
+        if _ocr_reader is not None:  # Initialized by another worker meanwhile
+            return _ocr_reader
         try:
             import easyocr
             print("🔤 Initializing EasyOCR reader (English)...")
-            _ocr_reader = easyocr.Reader(['en'], gpu=False, verbose=False)
+            reader = easyocr.Reader(['en'], gpu=False, verbose=False)
+            
+            from app.config import get_settings
+            settings = get_settings()
+            if settings.ocr_backend == "openvino":
+                _use_openvino(reader)
+            elif settings.ocr_quantize:
+                _quantize_recognizer(reader)
+            
+            _warmup_ocr_reader(reader)
+            _ocr_reader = reader  # Publish only once fully set up
             print("✅ EasyOCR initialized successfully")
         except ImportError:
             print("⚠️ EasyOCR not installed. Run: pip install easyocr")
@@ -33,6 +102,95 @@ def get_ocr_reader():
     return _ocr_reader
 
 
+class _OpenVINOModel:
+    """Callable stand-in for an EasyOCR torch model backed by OpenVINO."""
+    
+    def __init__(self, compiled_model):
+        self._compiled = compiled_model
+        self._n_inputs = len(compiled_model.inputs)
+    
+    def __call__(self, *inputs):
+        import torch
+        
+        # CRNN takes an unused text tensor that conversion may prune
+        arrays = [t.detach().cpu().numpy() for t in inputs[:self._n_inputs]]
+        result = self._compiled(arrays)
+        outputs = tuple(torch.from_numpy(result[out]) for out in self._compiled.outputs)
+        return outputs[0] if len(outputs) == 1 else outputs
+    
+    def eval(self):
+        return self
+
+
+def _use_openvino(reader) -> bool:
+    """
+    Replace the reader's CRAFT detector and CRNN recognizer with
+    OpenVINO-compiled CPU models. Keeps the PyTorch models on failure.
+    """
+    try:
+        import openvino as ov
+        import torch
+    except ImportError:
+        print("⚠️ OpenVINO not installed, using PyTorch for OCR. Run: pip install openvino")
+        return False
+    
+    try:
+        core = ov.Core()
+        
+        # Converted PyTorch models keep dynamic batch/height/width dimensions
+        detector = ov.convert_model(
+            reader.detector,
+            example_input=torch.zeros(1, 3, 64, 256),
+        )
+        recognizer = ov.convert_model(
+            reader.recognizer,
+            example_input=(torch.zeros(1, 1, 64, 256), torch.zeros(1, 1, dtype=torch.long)),
+        )
+        
+        reader.detector = _OpenVINOModel(core.compile_model(detector, "CPU"))
+        reader.recognizer = _OpenVINOModel(core.compile_model(recognizer, "CPU"))
+        print("✅ EasyOCR using OpenVINO backend")
+        return True
+    except Exception as e:
+        print(f"⚠️ OpenVINO conversion failed, using PyTorch for OCR: {e}")
+        return False
+
+
+def _quantize_recognizer(reader) -> bool:
+    """
+    Quantize the CRNN recognizer's Linear/LSTM layers to int8 (dynamic).
+    
+    Those layers dominate recognition time on CPU. Check plate accuracy
+    before enabling this in production (OCR_QUANTIZE=true).
+    """
+    try:
+        import torch
+        from torch import nn
+        
+        reader.recognizer = torch.ao.quantization.quantize_dynamic(
+            reader.recognizer, {nn.Linear, nn.LSTM}, dtype=torch.qint8
+        )
+        print("✅ EasyOCR recognizer quantized to int8")
+        return True
+    except Exception as e:
+        print(f"⚠️ Recognizer quantization failed, using FP32: {e}")
+        return False
+
+
+def _warmup_ocr_reader(reader):
+    """Run one dummy batch so the first real frame doesn't pay for allocation."""
+    if not hasattr(reader, 'readtext_batched'):
+        return
+    try:
+        dummy = np.zeros([OCR_BATCH_SIZE, OCR_BATCH_HEIGHT, OCR_BATCH_WIDTH, 3], dtype=np.uint8)
+        reader.readtext_batched(
+            dummy, n_width=OCR_BATCH_WIDTH, n_height=OCR_BATCH_HEIGHT,
+            batch_size=OCR_BATCH_SIZE, detail=0,
+        )
+    except Exception as e:
+        print(f"⚠️ EasyOCR warm-up failed: {e}")
+
+
 def preprocess_plate_image(image: np.ndarray) -> np.ndarray:
     """
     Preprocess license plate image for better OCR accuracy.
@@ -48,23 +206,22 @@ def preprocess_plate_image(image: np.ndarray) -> np.ndarray:
     Returns:
         Preprocessed binary image ready for OCR
     """
-    # Convert to grayscale
+    # Convert to grayscale (one buffer, reused in place by every step below)
     if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        binary = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
+        binary = image.copy()
     
     # Apply Gaussian blur to reduce noise
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    cv2.GaussianBlur(binary, (5, 5), 0, dst=binary)
     
     # Apply Otsu's thresholding for automatic binary conversion
-    _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    cv2.threshold(binary, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=binary)
     
     # Optional: Invert if background is dark (white text on dark plate)
-    # Check if the image is mostly dark
-    mean_val = np.mean(binary)
-    if mean_val < 127:
-        binary = cv2.bitwise_not(binary)
+    # Check if the image is mostly dark: mean < 127 over 0/255 pixels, in integers
+    if cv2.countNonZero(binary) * 255 < 127 * binary.size:
+        cv2.bitwise_not(binary, dst=binary)
     
     return binary
 
@@ -90,10 +247,10 @@ def clean_plate_text(text: str) -> str:
     text = text.upper()
     
     # Keep only alphanumeric, hyphen, and space
-    text = re.sub(r'[^A-Z0-9\-\s]', '', text)
+    text = _CLEAN_RE.sub('', text)
     
     # Normalize multiple spaces to single space
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _SPACE_RE.sub(' ', text).strip()
     
     # Common OCR corrections for Sri Lankan plates
     replacements = {
@@ -135,49 +292,55 @@ def validate_plate_text(text: str) -> bool:
         return False
     
     # Must contain at least one letter and one digit
-    has_letter = bool(re.search(r'[A-Z]', text))
-    has_digit = bool(re.search(r'[0-9]', text))
+    raw = text.encode('ascii', 'ignore')
+    letter_count = raw.translate(_IS_UPPER).count(1)
+    digit_count = raw.translate(_IS_DIGIT).count(1)
     
-    if not (has_letter or has_digit):
+    if not (letter_count or digit_count):
         return False
     
-    # Sri Lankan plate patterns (flexible matching)
-    patterns = [
-        # Province code + letters + hyphen + numbers: WP ABC-1234
-        r'^[A-Z]{2,3}\s?[A-Z]{1,4}[\-\s]?\d{4}$',
-        
-        # Province code + letters + numbers (no hyphen): WP CAB1234
-        r'^[A-Z]{2,3}\s?[A-Z]{1,4}\d{4}$',
-        
-        # Old format with hyphen: 123-4567 or 12-3456
-        r'^\d{2,3}[\-\s]?\d{4}$',
-        
-        # Bike/motorbike format: WP AB-1234
-        r'^[A-Z]{2}\s?[A-Z]{2}[\-\s]?\d{4}$',
-        
-        # Partial matches (at least 2 letters followed by digits)
-        r'^[A-Z]{2,}\s?[\-]?\s?\d{3,}$',
-        
-        # Generic: starts with letters, ends with numbers
-        r'^[A-Z]+.*\d{3,}$',
-    ]
-    
-    for pattern in patterns:
-        if re.match(pattern, text):
-            return True
+    if _PLATE_RE.match(text) is not None:
+        return True
     
     # Fallback: If it has reasonable letter-number mix, accept it
     # This helps with partially visible plates
-    letter_count = len(re.findall(r'[A-Z]', text))
-    digit_count = len(re.findall(r'[0-9]', text))
-    
     if letter_count >= 2 and digit_count >= 3:
         return True
     
     return False
 
 
-def read_plate(image_crop: np.ndarray) -> Optional[str]:
+def plate_hash(image: np.ndarray) -> int:
+    """
+    64-bit difference hash (dHash) of a plate crop.
+    
+    Near-identical crops of the same plate in consecutive frames map to
+    the same value, so it is used as the OCR cache key.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _cache_get(key: Tuple[Optional[int], int]):
+    """Return (hit, text) for a cache key, refreshing its LRU position."""
+    with _ocr_cache_lock:
+        if key in _ocr_cache:
+            _ocr_cache.move_to_end(key)
+            return True, _ocr_cache[key]
+    return False, None
+
+
+def _cache_put(key: Tuple[Optional[int], int], text: Optional[str]):
+    with _ocr_cache_lock:
+        _ocr_cache[key] = text
+        _ocr_cache.move_to_end(key)
+        if len(_ocr_cache) > OCR_CACHE_SIZE:
+            _ocr_cache.popitem(last=False)
+
+
+def read_plate(image_crop: np.ndarray, vehicle_id: Optional[int] = None) -> Optional[str]:
     """
     Read license plate text from a cropped plate image.
     
@@ -187,8 +350,12 @@ def read_plate(image_crop: np.ndarray) -> Optional[str]:
     3. Cleans and validates the result
     4. Returns None if text is invalid (filters out false positives)
     
+    Results are cached per (vehicle_id, plate_hash) so repeated crops of
+    the same plate are only read once.
+    
     Args:
         image_crop: BGR image of the cropped license plate
+        vehicle_id: Tracker ID of the vehicle, keeps cache entries per vehicle
     
     Returns:
         Cleaned plate text if valid, None otherwise
@@ -206,7 +373,25 @@ def read_plate(image_crop: np.ndarray) -> Optional[str]:
     if reader is None:
         return None
     
+    key = (vehicle_id, plate_hash(image_crop))
+    hit, plate_text = _cache_get(key)
+    if hit:
+        return plate_text
+    
+    plate_text = _read_plate_uncached(reader, image_crop)
+    _cache_put(key, plate_text)
+    return plate_text
+
+
+def _read_plate_uncached(reader, image_crop: np.ndarray) -> Optional[str]:
+    """Run the OCR passes for read_plate without consulting the cache."""
     try:
+        # Shrink over-large crops once, used by both OCR passes
+        h, w = image_crop.shape[:2]
+        if h > OCR_MAX_CROP_HEIGHT:
+            new_w = max(1, int(w * OCR_TARGET_HEIGHT / h))
+            image_crop = cv2.resize(image_crop, (new_w, OCR_TARGET_HEIGHT), interpolation=cv2.INTER_AREA)
+        
         # Preprocess the image
         preprocessed = preprocess_plate_image(image_crop)
         
@@ -218,31 +403,184 @@ def read_plate(image_crop: np.ndarray) -> Optional[str]:
         ocr_results = reader.readtext(preprocessed, detail=0, paragraph=False)
         results.extend(ocr_results)
         
+        # Valid plate from the first pass - no need for a second OCR pass
+        plate_text = _plate_text_from_results(results)
+        if plate_text:
+            return plate_text
+        
         # Also try original if preprocessed didn't work well
         if not results or all(len(r) < 3 for r in results):
             ocr_results = reader.readtext(image_crop, detail=0, paragraph=False)
             results.extend(ocr_results)
         
-        if not results:
-            return None
-        
-        # Combine all detected text
-        combined_text = ' '.join(results)
-        
-        # Clean the text
-        cleaned = clean_plate_text(combined_text)
-        
-        # Validate
-        if validate_plate_text(cleaned):
-            return cleaned
-        
-        return None
+        return _plate_text_from_results(results)
         
     except Exception as e:
         # Silently fail - OCR errors shouldn't crash the system
         return None
 
 
+def _plate_text_from_results(results: List[str]) -> Optional[str]:
+    """Combine, clean and validate OCR text fragments."""
+    if not results:
+        return None
+    
+    # Combine all detected text
+    combined_text = ' '.join(results)
+    
+    # Clean the text
+    cleaned = clean_plate_text(combined_text)
+    
+    # Validate
+    if validate_plate_text(cleaned):
+        return cleaned
+    
+    return None
+
+
+def _resize_for_batch(image: np.ndarray) -> np.ndarray:
+    """
+    Letterbox a crop into the shared batch shape, keeping its aspect ratio.
+    
+    The crop is scaled to OCR_BATCH_HEIGHT like read_plate does (only
+    crops that would then be wider than OCR_BATCH_WIDTH are scaled down to
+    fit) and padded with its median colour, so two-line and square plates
+    are not squashed.
+    """
+    h, w = image.shape[:2]
+    scale = min(OCR_BATCH_HEIGHT / h, OCR_BATCH_WIDTH / w)
+    new_w = min(OCR_BATCH_WIDTH, max(1, round(w * scale)))
+    new_h = min(OCR_BATCH_HEIGHT, max(1, round(h * scale)))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    resized = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+    
+    # Pad right (and top/bottom when width-limited) with the plate background
+    fill = np.median(resized.reshape(-1, resized.shape[2] if resized.ndim == 3 else 1), axis=0)
+    top = (OCR_BATCH_HEIGHT - new_h) // 2
+    return cv2.copyMakeBorder(
+        resized, top, OCR_BATCH_HEIGHT - new_h - top, 0, OCR_BATCH_WIDTH - new_w,
+        cv2.BORDER_CONSTANT, value=fill.tolist(),
+    )
+
+
+def read_plates_batch(
+    image_crops: List[np.ndarray],
+    vehicle_ids: Optional[List[int]] = None
+) -> List[Optional[str]]:
+    """
+    Read license plate text from many cropped plate images at once.
+    
+    Same pipeline as read_plate, but all crops are letterboxed to
+    OCR_BATCH_WIDTH x OCR_BATCH_HEIGHT and sent through
+    reader.readtext_batched in one call, so detection and recognition run
+    as batches instead of once per vehicle. Crops whose preprocessed
+    image yields no usable text are retried together from the original.
+    Crops already in the OCR cache are not sent to the reader.
+    
+    Args:
+        image_crops: BGR images of the cropped license plates
+        vehicle_ids: Tracker IDs matching image_crops, used in the cache key
+    
+    Returns:
+        Plate text (or None) for each crop, in input order
+    """
+    texts: List[Optional[str]] = [None] * len(image_crops)
+    
+    # Same size filter as read_plate
+    valid = [
+        i for i, crop in enumerate(image_crops)
+        if crop is not None and crop.size > 0
+        and crop.shape[1] >= 20 and crop.shape[0] >= 10
+    ]
+    if not valid:
+        return texts
+    
+    reader = get_ocr_reader()
+    if reader is None:
+        return texts
+    
+    if vehicle_ids is None:
+        vehicle_ids = [None] * len(image_crops)
+    
+    # Older EasyOCR releases have no batched API
+    if not hasattr(reader, 'readtext_batched'):
+        for i in valid:
+            texts[i] = read_plate(image_crops[i], vehicle_ids[i])
+        return texts
+    
+    keys = {}
+    misses = []
+    for i in valid:
+        keys[i] = (vehicle_ids[i], plate_hash(image_crops[i]))
+        hit, texts[i] = _cache_get(keys[i])
+        if not hit:
+            misses.append(i)
+    valid = misses
+    if not valid:
+        return texts
+    
+    try:
+        batch = [_resize_for_batch(preprocess_plate_image(image_crops[i])) for i in valid]
+        batch_results = reader.readtext_batched(
+            batch, n_width=OCR_BATCH_WIDTH, n_height=OCR_BATCH_HEIGHT,
+            batch_size=OCR_BATCH_SIZE, detail=0, paragraph=False,
+        )
+        results = {i: list(r) for i, r in zip(valid, batch_results)}
+        for i in valid:
+            texts[i] = _plate_text_from_results(results[i])
+        
+        # Also try originals where preprocessing didn't work well
+        retry = [
+            i for i in valid
+            if texts[i] is None and (not results[i] or all(len(r) < 3 for r in results[i]))
+        ]
+        if retry:
+            originals = [_resize_for_batch(image_crops[i]) for i in retry]
+            retry_results = reader.readtext_batched(
+                originals, n_width=OCR_BATCH_WIDTH, n_height=OCR_BATCH_HEIGHT,
+                batch_size=OCR_BATCH_SIZE, detail=0, paragraph=False,
+            )
+            for i, r in zip(retry, retry_results):
+                results[i].extend(r)
+                texts[i] = _plate_text_from_results(results[i])
+        
+        for i in valid:
+            _cache_put(keys[i], texts[i])
+    
+    except Exception:
+        # Silently fail - OCR errors shouldn't crash the system
+        pass
+    
+    return texts
+
+
+def submit_plates_batch(
+    image_crops: List[np.ndarray],
+    vehicle_ids: Optional[List[int]] = None
+) -> Future:
+    """
+    Run read_plates_batch on the background OCR pool.
+    
+    The crops must not be modified until the future completes (pass
+    copies of frame regions that will be drawn on or reused).
+    
+    Returns:
+        Future resolving to the read_plates_batch result list
+    """
+    global _ocr_executor
+    if _ocr_executor is None:
+        _ocr_executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+    return _ocr_executor.submit(read_plates_batch, image_crops, vehicle_ids)
+
+
+def shutdown_ocr_executor(wait: bool = True):
+    """Stop the background OCR pool."""
+    global _ocr_executor
+    if _ocr_executor is not None:
+        _ocr_executor.shutdown(wait=wait, cancel_futures=True)
+        _ocr_executor = None
+
+
 def read_plate_with_confidence(image_crop: np.ndarray) -> Tuple[Optional[str], float]:
     """
     Read license plate text with confidence score.
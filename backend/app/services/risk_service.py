@@ -16,11 +16,22 @@ Risk Levels:
 """
 
 import sqlite3
+import threading
+from bisect import bisect_right
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
+try:
+    from numba import float64, njit, vectorize
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Database path
 DB_PATH = Path(__file__).parent.parent.parent / "traffic.db"
 
@@ -44,6 +55,15 @@ VIOLATION_WEIGHTS = {
     'default': 10,
 }
 
+# Violation types as small int ids indexing a weight table (last id = default)
+_VIOLATION_TYPES = tuple(t for t in VIOLATION_WEIGHTS if t != 'default')
+_VIOLATION_TYPE_ID = {t: i for i, t in enumerate(_VIOLATION_TYPES)}
+_DEFAULT_VIOLATION_ID = len(_VIOLATION_TYPES)
+_VIOLATION_WEIGHT_TABLE = np.array(
+    [VIOLATION_WEIGHTS[t] for t in _VIOLATION_TYPES] + [VIOLATION_WEIGHTS['default']],
+    dtype=np.int16,
+)
+
 # Risk level thresholds
 RISK_LEVELS = {
     'LOW': (0, 30),
@@ -52,12 +72,41 @@ RISK_LEVELS = {
     'CRITICAL': (80, 101),
 }
 
+# Same levels as sorted lower bounds: level index = number of bounds <= score
+_RISK_LABELS = tuple(RISK_LEVELS)
+_RISK_LABELS_ARR = np.array(_RISK_LABELS, dtype=object)
+_RISK_THRESHOLDS = np.array([low for low, _ in RISK_LEVELS.values()][1:], dtype=np.float64)
+_RISK_THRESHOLDS_LIST = _RISK_THRESHOLDS.tolist()
+
+
+# =============================================================================
+# DATABASE CONNECTION
+# =============================================================================
+
+# One connection per thread, opened on first use and kept for the process.
+# sqlite3 keeps a per-connection prepared-statement cache, so the fixed SQL
+# strings below are compiled once per thread rather than on every call.
+_conn = threading.local()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Return this thread's cached connection, opening it in WAL mode if needed."""
+    conn = getattr(_conn, 'c', None)
+    if conn is None:
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA busy_timeout=5000")
+        _conn.c = conn
+    return conn
+
 
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RiskScore:
     """Container for risk score calculation result."""
     vehicle_id: int
@@ -89,10 +138,107 @@ class RiskScore:
         }
 
 
+# =============================================================================
+# NUMERIC KERNELS (compiled with Numba when installed)
+# =============================================================================
+
+def _speed_factor_kernel(current_speed: float, speed_limit: float) -> float:
+    """
+    Speed factor bracket ladder; see calculate_speed_factor.
+    
+    The brackets join up, so the ladder is written as a sum of clamped
+    linear segments instead of an if/elif chain:
+    
+        ratio <= 0.8        0               (safe speed)
+        0.8 - 1.0           0 -> 20         (approaching limit)
+        1.0 - 1.2           20 -> 50        (slightly over)
+        1.2 - 1.5           50 -> 100       (significantly over)
+        > 1.5               100             (extremely over)
+    """
+    if speed_limit <= 0:
+        speed_limit = 60.0  # Default
+    
+    speed_ratio = current_speed / speed_limit
+    
+    speed_factor = (
+        min(max((speed_ratio - 0.8) * 100, 0.0), 20.0)
+        + min(max((speed_ratio - 1.0) * 150, 0.0), 30.0)
+        + max((speed_ratio - 1.2) * 166.67, 0.0)
+    )
+    
+    return min(100.0, max(0.0, speed_factor))
+
+
+def _history_score_kernel(type_ids: np.ndarray, weights: np.ndarray) -> int:
+    """Sum violation weights by type id, capped at 100."""
+    total = 0
+    for i in range(type_ids.shape[0]):
+        total += weights[type_ids[i]]
+    return min(100, total)
+
+
+def _risk_kernel(current_speed: float, speed_limit: float, violation_count: int):
+    """
+    Whole calculate_risk formula in one call.
+    
+    Returns:
+        (risk_score, speed_factor, history_factor, index into _RISK_LABELS)
+    """
+    speed_factor = _speed_factor_kernel(current_speed, speed_limit)
+    history_factor = min(100, violation_count * 10)
+    risk_score = (speed_factor * SPEED_WEIGHT) + (history_factor * HISTORY_WEIGHT)
+    
+    level = 0
+    for threshold in _RISK_THRESHOLDS:
+        if risk_score >= threshold:
+            level += 1
+    
+    return risk_score, speed_factor, history_factor, level
+
+
+_speed_factor_ufunc = None
+
+if NUMBA_AVAILABLE:
+    _speed_factor_ufunc = vectorize([float64(float64, float64)], cache=True)(_speed_factor_kernel)
+    _speed_factor_kernel = njit(cache=True, nogil=True)(_speed_factor_kernel)
+    _history_score_kernel = njit(cache=True, nogil=True)(_history_score_kernel)
+    _risk_kernel = njit(cache=True, nogil=True)(_risk_kernel)
+    
+    # Compile (or load from cache) at import, not on the first request
+    _speed_factor_kernel(0.0, 60.0)
+    _history_score_kernel(np.zeros(1, dtype=np.int32), _VIOLATION_WEIGHT_TABLE)
+    _risk_kernel(0.0, 60.0, 0)
+
+
 # =============================================================================
 # CORE FUNCTIONS
 # =============================================================================
 
+@lru_cache(maxsize=64)
+def _violation_type_id(violation_type: str) -> int:
+    """Id of one violation type name; repeated names skip str.lower()."""
+    return _VIOLATION_TYPE_ID.get(violation_type.lower(), _DEFAULT_VIOLATION_ID)
+
+
+def violation_type_ids(violation_types: List[str]) -> np.ndarray:
+    """
+    Intern violation type names into ids for calculate_history_factor.
+    
+    Unknown types map to the 'default' weight.
+    
+    Args:
+        violation_types: Violation type names (case-insensitive)
+        
+    Returns:
+        int32 array of violation type ids
+    """
+    return np.fromiter(
+        map(_violation_type_id, violation_types),
+        dtype=np.int32,
+        count=len(violation_types),
+    )
+
+
 def calculate_speed_factor(current_speed: float, speed_limit: float) -> float:
     """
     Calculate the speed factor component of risk score.
@@ -106,35 +252,47 @@ def calculate_speed_factor(current_speed: float, speed_limit: float) -> float:
     Returns:
         Speed factor (0-100)
     """
-    if speed_limit <= 0:
-        speed_limit = 60.0  # Default
+    return _speed_factor_kernel(float(current_speed), float(speed_limit))
+
+
+def calculate_speed_factors_vec(speeds: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_speed_factor for many vehicles at once.
     
-    speed_ratio = current_speed / speed_limit
+    Same brackets as the scalar version, evaluated as a compiled ufunc when
+    Numba is installed and with np.select over the whole array otherwise.
     
-    # Calculate speed factor based on ratio brackets
-    if speed_ratio <= 0.8:
-        # Safe speed (under 80% of limit)
-        speed_factor = 0
-    elif speed_ratio <= 1.0:
-        # Approaching limit (80-100%)
-        # Linear scale: 0-20
-        speed_factor = (speed_ratio - 0.8) * 100  # 0 at 0.8, 20 at 1.0
-    elif speed_ratio <= 1.2:
-        # Slightly over (100-120%)
-        # Linear scale: 20-50
-        speed_factor = 20 + (speed_ratio - 1.0) * 150  # 20 at 1.0, 50 at 1.2
-    elif speed_ratio <= 1.5:
-        # Significantly over (120-150%)
-        # Linear scale: 50-100
-        speed_factor = 50 + (speed_ratio - 1.2) * 166.67  # 50 at 1.2, 100 at 1.5
-    else:
-        # Extremely over (>150%)
-        speed_factor = 100
-    
-    return min(100, max(0, speed_factor))
-
-
-def calculate_history_factor(violation_history_count: int = None, violations: List[Dict] = None) -> float:
+    Args:
+        speeds: Current vehicle speeds
+        limits: Speed limits, one per vehicle (<= 0 means default 60)
+        
+    Returns:
+        Speed factors (0-100), float64 array shaped like speeds
+    """
+    speeds = np.asarray(speeds, dtype=np.float64)
+    limits = np.asarray(limits, dtype=np.float64)
+    if _speed_factor_ufunc is not None:
+        return _speed_factor_ufunc(speeds, limits)
+    
+    r = speeds / np.where(limits > 0, limits, 60.0)
+    
+    conds = [r <= 0.8, r <= 1.0, r <= 1.2, r <= 1.5]
+    choices = [
+        0.0,
+        (r - 0.8) * 100,
+        20 + (r - 1.0) * 150,
+        50 + (r - 1.2) * 166.67,
+    ]
+    out = np.select(conds, choices, default=100.0)
+    np.clip(out, 0, 100, out=out)
+    return out
+
+
+def calculate_history_factor(
+    violation_history_count: int = None,
+    violations: List[Dict] = None,
+    violation_ids: np.ndarray = None
+) -> float:
     """
     Calculate the violation history factor component of risk score.
     
@@ -143,18 +301,21 @@ def calculate_history_factor(violation_history_count: int = None, violations: Li
     Args:
         violation_history_count: Simple count of violations (if no details available)
         violations: List of violation dicts with 'type' key (for weighted calculation)
+        violation_ids: Violation type ids from violation_type_ids (weighted, fastest)
         
     Returns:
         History factor (0-100)
     """
     history_score = 0
     
-    if violations:
+    if violation_ids is None and violations:
+        violation_ids = violation_type_ids([
+            v.get('type', v.get('violation_type', 'default')) for v in violations
+        ])
+    
+    if violation_ids is not None and len(violation_ids):
         # Weighted calculation based on violation types
-        for v in violations:
-            violation_type = v.get('type', v.get('violation_type', 'default'))
-            weight = VIOLATION_WEIGHTS.get(violation_type.lower(), VIOLATION_WEIGHTS['default'])
-            history_score += weight
+        history_score = int(_history_score_kernel(violation_ids, _VIOLATION_WEIGHT_TABLE))
     elif violation_history_count is not None:
         # Simple calculation: 10 points per violation
         history_score = violation_history_count * 10
@@ -173,10 +334,47 @@ def get_risk_level(score: float) -> str:
     Returns:
         Risk level string: 'LOW', 'MEDIUM', 'HIGH', or 'CRITICAL'
     """
-    for level, (low, high) in RISK_LEVELS.items():
-        if low <= score < high:
-            return level
-    return 'CRITICAL'
+    # bisect on a list beats np.searchsorted for a single Python float
+    return _RISK_LABELS[bisect_right(_RISK_THRESHOLDS_LIST, score)]
+
+
+def get_risk_levels_vec(scores: np.ndarray) -> List[str]:
+    """
+    Classify many risk scores at once with one np.searchsorted call.
+    
+    Args:
+        scores: Risk scores (0-100), e.g. from calculate_speed_factors_vec
+        
+    Returns:
+        Risk level string per score
+    """
+    idx = np.searchsorted(_RISK_THRESHOLDS, scores, side='right')
+    return _RISK_LABELS_ARR[idx].tolist()
+
+
+def calculate_risk_scores(
+    speeds: np.ndarray,
+    limits: np.ndarray,
+    violation_counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    Score many vehicles in one NumPy pass (vectorized calculate_risk).
+    
+    Uses the count-based history factor (10 points per violation), the
+    same as calculate_risk with violation_history_count.
+    
+    Args:
+        speeds: Current vehicle speeds
+        limits: Speed limits, one per vehicle
+        violation_counts: Past violation counts, one per vehicle
+        
+    Returns:
+        (risk_scores, speed_factors, history_factors, risk_levels)
+    """
+    speed_factors = calculate_speed_factors_vec(speeds, limits)
+    history_factors = np.minimum(np.asarray(violation_counts, dtype=np.float64) * 10, 100)
+    risk_scores = speed_factors * SPEED_WEIGHT + history_factors * HISTORY_WEIGHT
+    return risk_scores, speed_factors, history_factors, get_risk_levels_vec(risk_scores)
 
 
 def calculate_risk(
@@ -201,15 +399,11 @@ def calculate_risk(
     Returns:
         RiskScore object with detailed calculation.
     """
-    # Calculate components
-    speed_factor = calculate_speed_factor(speed, speed_limit)
-    history_factor = calculate_history_factor(violation_history_count=violation_history_count)
-    
-    # Final risk score
-    risk_score = (speed_factor * SPEED_WEIGHT) + (history_factor * HISTORY_WEIGHT)
-    
-    # Get risk level
-    risk_level = get_risk_level(risk_score)
+    # Speed factor, history factor, weighted score and level in one compiled call
+    risk_score, speed_factor, history_factor, level = _risk_kernel(
+        float(speed), float(speed_limit), int(violation_history_count)
+    )
+    risk_level = _RISK_LABELS[level]
     
     return RiskScore(
         vehicle_id=vehicle_id,
@@ -224,6 +418,78 @@ def calculate_risk(
     )
 
 
+def calculate_risk_batch(
+    speeds: np.ndarray,
+    limits: np.ndarray,
+    counts: np.ndarray,
+    vehicle_ids: List[int] = None,
+    plate_numbers: List[Optional[str]] = None
+) -> List[RiskScore]:
+    """
+    Batched calculate_risk: one vectorized pass, then one RiskScore per vehicle.
+    
+    Args:
+        speeds: Current vehicle speeds
+        limits: Speed limits, one per vehicle
+        counts: Past violation counts, one per vehicle
+        vehicle_ids: Optional vehicle/track IDs (default 0)
+        plate_numbers: Optional license plates (default None)
+        
+    Returns:
+        RiskScore objects in input order.
+    """
+    speeds = np.asarray(speeds, dtype=np.float64)
+    limits = np.asarray(limits, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    n = speeds.shape[0]
+    
+    risk_scores, speed_factors, history_factors, levels = calculate_risk_scores(speeds, limits, counts)
+    if vehicle_ids is None:
+        vehicle_ids = [0] * n
+    if plate_numbers is None:
+        plate_numbers = [None] * n
+    
+    return [
+        RiskScore(
+            vehicle_id=vid,
+            plate_number=plate,
+            risk_score=score,
+            speed_factor=sf,
+            violation_history_factor=hf,
+            risk_level=level,
+            current_speed=speed,
+            speed_limit=limit,
+            violation_count=count
+        )
+        for vid, plate, score, sf, hf, level, speed, limit, count in zip(
+            vehicle_ids, plate_numbers, risk_scores.tolist(), speed_factors.tolist(),
+            history_factors.tolist(), levels, speeds.tolist(), limits.tolist(), counts.tolist()
+        )
+    ]
+
+
+_INSERT_RISK_SCORE_SQL = """
+    INSERT INTO risk_scores (
+        vehicle_id, plate_number, risk_score, speed_factor,
+        violation_history_factor, risk_level, current_speed, speed_limit
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _risk_score_row(risk: RiskScore) -> tuple:
+    """Column values of a RiskScore for _INSERT_RISK_SCORE_SQL."""
+    return (
+        risk.vehicle_id,
+        risk.plate_number,
+        risk.risk_score,
+        risk.speed_factor,
+        risk.violation_history_factor,
+        risk.risk_level,
+        risk.current_speed,
+        risk.speed_limit
+    )
+
+
 def save_risk_score_to_database(risk: RiskScore) -> int:
     """
     Save the calculated risk score to the risk_scores table.
@@ -234,33 +500,46 @@ def save_risk_score_to_database(risk: RiskScore) -> int:
     Returns:
         ID of the inserted record.
     """
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-            INSERT INTO risk_scores (
-                vehicle_id, plate_number, risk_score, speed_factor,
-                violation_history_factor, risk_level, current_speed, speed_limit
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            risk.vehicle_id,
-            risk.plate_number,
-            risk.risk_score,
-            risk.speed_factor,
-            risk.violation_history_factor,
-            risk.risk_level,
-            risk.current_speed,
-            risk.speed_limit
-        ))
+        cursor.execute(_INSERT_RISK_SCORE_SQL, _risk_score_row(risk))
         
         conn.commit()
         risk_id = cursor.lastrowid
         print(f"[RISK] Saved score #{risk_id}: {risk.risk_score:.1f} ({risk.risk_level}) for vehicle {risk.vehicle_id}")
         return risk_id
         
+    except Exception:
+        conn.rollback()
+        raise
+        
     finally:
-        conn.close()
+        cursor.close()
+
+
+def save_risk_scores_batch(risks: List[RiskScore]) -> int:
+    """
+    Save many risk scores in a single transaction.
+    
+    One commit (and one fsync) for the whole batch instead of one per row.
+    
+    Args:
+        risks: RiskScore objects to insert.
+        
+    Returns:
+        Number of rows inserted.
+    """
+    if not risks:
+        return 0
+    
+    conn = _get_conn()
+    with conn:
+        conn.executemany(_INSERT_RISK_SCORE_SQL, [_risk_score_row(r) for r in risks])
+    
+    print(f"[RISK] Saved {len(risks)} scores")
+    return len(risks)
 
 
 def get_recent_violations(vehicle_id: int = None, plate_number: str = None, days: int = 30) -> List[Dict]:
@@ -275,7 +554,7 @@ def get_recent_violations(vehicle_id: int = None, plate_number: str = None, days
     Returns:
         List of violation dicts.
     """
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     cursor = conn.cursor()
     
     try:
@@ -303,7 +582,7 @@ def get_recent_violations(vehicle_id: int = None, plate_number: str = None, days
         return []
         
     finally:
-        conn.close()
+        cursor.close()
 
 
 def get_high_risk_vehicles(threshold: float = 60.0, limit: int = 20) -> List[Dict]:
@@ -317,7 +596,7 @@ def get_high_risk_vehicles(threshold: float = 60.0, limit: int = 20) -> List[Dic
     Returns:
         List of high-risk vehicle records.
     """
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     cursor = conn.cursor()
     
     try:
@@ -332,7 +611,7 @@ def get_high_risk_vehicles(threshold: float = 60.0, limit: int = 20) -> List[Dic
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
         
     finally:
-        conn.close()
+        cursor.close()
 
 
 def log_abnormal_behavior(
@@ -355,7 +634,7 @@ def log_abnormal_behavior(
     Returns:
         ID of the inserted record.
     """
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     cursor = conn.cursor()
     
     try:
@@ -370,8 +649,12 @@ def log_abnormal_behavior(
         print(f"[BEHAVIOR] Logged {behavior_type} ({severity}) for vehicle {vehicle_id}")
         return log_id
         
+    except Exception:
+        conn.rollback()
+        raise
+        
     finally:
-        conn.close()
+        cursor.close()
 
 
 def calculate_and_save_risk(
@@ -13,8 +13,9 @@ Smart Features:
 5. Filters out tiny/blurry crops (< 60x60 pixels)
 
 The Algorithm:
-- saved_counts = {track_id: N} - tracks how many crops per vehicle
-- last_saved_frame = {track_id: frame_number} - prevents instant duplicates
+- saved_counts[track_id] = N - tracks how many crops per vehicle
+- last_saved_frame[track_id] = frame_number - prevents instant duplicates
+  (both are NumPy arrays, so each frame's detections are filtered at once)
 - If saved_counts[track_id] < 3 AND (now - last_saved_frame[track_id]) >= 30:
     Save the crop and update both dictionaries
 
@@ -23,6 +24,7 @@ Usage:
 
 Output:
     Creates: backend/data/raw_crops/crop_{track_id}_{sequence}.jpg
+    With --archive: backend/data/raw_crops/crops-{shard}.tar (same JPEGs, tar shards)
     
 Next Steps:
     1. Manually annotate crops with license plate locations using Roboflow/LabelImg
@@ -30,19 +32,30 @@ Next Steps:
     3. Retrain best_plate.pt model on this fine-tuned dataset
 """
 
+import io
 import sys
 import time
 import shutil
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import List, Tuple
 
 import cv2
+import numpy as np
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from app.config import get_settings
-from app.detection.yolo_detector import load_vehicle_model, track_vehicles
+from app.detection.yolo_detector import load_vehicle_model
 
 settings = get_settings()
 
@@ -60,6 +73,23 @@ MIN_CROP_SIZE = 60  # Ignore crops smaller than 60x60 pixels
 MAX_CROPS_PER_VEHICLE = 3  # Save max 3 different angles per vehicle
 FRAME_SPACING = 30  # Only save vehicle once every 30 frames (1 second @ 30fps)
 
+# Frames per model.track() call; the tracker still sees them in order
+BATCH_SIZE = 8
+
+# Track every Nth frame; the frames in between are grabbed but never converted
+# or run through YOLO. Far below FRAME_SPACING, and dense enough (10 fps @ 30fps)
+# for the tracker to keep IDs.
+FRAME_STRIDE = 3
+
+# JPEG encoding + disk writes run on background threads (cv2.imwrite releases the GIL)
+WRITE_WORKERS = 4
+
+# --archive mode: crops per tar shard (sequential writes instead of many small files)
+ARCHIVE_SHARD_SIZE = 1000
+
+# Initial size of the per-track dedup arrays; doubled when larger IDs appear
+TRACK_STATE_CAPACITY = 1024
+
 # Class names for logging
 VEHICLE_NAMES = {
     2: "car",
@@ -69,11 +99,140 @@ VEHICLE_NAMES = {
 }
 
 
+def track_vehicle_batch(
+    model, frames, confidence: float = 0.5
+) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Track vehicles over a batch of consecutive frames with one model call.
+    
+    Returns:
+        One (track_ids (N,), class_ids (N,), boxes (N, 4) xyxy) tuple of
+        int64 arrays per frame; track_id is -1 when the tracker gave none
+    """
+    results = model.track(
+        source=frames,
+        conf=confidence,
+        classes=VEHICLE_CLASS_IDS,
+        persist=True,
+        verbose=False,
+    )
+    
+    empty = np.zeros(0, dtype=np.int64)
+    batch = []
+    for result in results:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            batch.append((empty, empty, np.zeros((0, 4), dtype=np.int64)))
+            continue
+        
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.int64)
+        cls_ids = boxes.cls.cpu().numpy().astype(np.int64)
+        if boxes.id is not None:
+            track_ids = boxes.id.cpu().numpy().astype(np.int64)
+        else:
+            track_ids = np.full(len(cls_ids), -1, dtype=np.int64)
+        batch.append((track_ids, cls_ids, xyxy))
+    return batch
+
+
+def _grow_track_state(
+    saved_counts: np.ndarray, last_saved_frame: np.ndarray, min_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the dedup arrays grown (by doubling) to hold at least min_size slots."""
+    size = max(min_size, 2 * saved_counts.shape[0])
+    grown_counts = np.zeros(size, dtype=np.int32)
+    grown_last = np.full(size, -FRAME_SPACING, dtype=np.int32)
+    grown_counts[:saved_counts.shape[0]] = saved_counts
+    grown_last[:last_saved_frame.shape[0]] = last_saved_frame
+    return grown_counts, grown_last
+
+
+class CropArchive:
+    """
+    Append JPEG crops to numbered tar shards (crops-00000.tar, ...).
+    
+    Thread-safe; shards roll over every `shard_size` crops.
+    """
+    
+    def __init__(self, output_dir: Path, shard_size: int = ARCHIVE_SHARD_SIZE):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.shard_idx = 0
+        self.in_shard = 0
+        self._tar = None
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, data: bytes):
+        """Append one encoded crop under `name`."""
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        
+        with self._lock:
+            if self._tar is None or self.in_shard >= self.shard_size:
+                if self._tar is not None:
+                    self._tar.close()
+                    self.shard_idx += 1
+                shard_path = self.output_dir / f"crops-{self.shard_idx:05d}.tar"
+                self._tar = tarfile.open(shard_path, "w")
+                self.in_shard = 0
+            self._tar.addfile(info, io.BytesIO(data))
+            self.in_shard += 1
+    
+    def close(self):
+        with self._lock:
+            if self._tar is not None:
+                self._tar.close()
+                self._tar = None
+
+
+def write_crop(filepath: Path, crop: np.ndarray, archive: CropArchive = None) -> bool:
+    """Write a crop as its own JPEG, or append it to the tar archive."""
+    if archive is None:
+        return cv2.imwrite(str(filepath), crop)
+    
+    ok, buf = cv2.imencode(".jpg", crop)
+    if ok:
+        archive.add(filepath.name, buf.tobytes())
+    return ok
+
+
+def open_video(path: Path, hwaccel: bool = True):
+    """
+    Open a video with FFmpeg, preferring hardware decoding.
+    
+    Asks OpenCV for any available accelerator (NVDEC, VAAPI, QSV, D3D11);
+    falls back to software decoding if that capture cannot be opened.
+    
+    Returns:
+        (cv2.VideoCapture, True if hardware decoding is active)
+    """
+    if hwaccel:
+        try:
+            cap = cv2.VideoCapture(
+                str(path), cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+            )
+            if cap.isOpened():
+                accel = int(cap.get(cv2.CAP_PROP_HW_ACCELERATION))
+                return cap, accel not in (cv2.VIDEO_ACCELERATION_NONE, cv2.VIDEO_ACCELERATION_ANY)
+            cap.release()
+        except (cv2.error, AttributeError):
+            pass
+    
+    return cv2.VideoCapture(str(path)), False
+
+
 # ============================================================================
 # SMART CROP COLLECTION WITH DEDUPLICATION
 # ============================================================================
 
-def collect_vehicle_crops():
+def collect_vehicle_crops(
+    batch_size: int = BATCH_SIZE,
+    archive: bool = False,
+    stride: int = FRAME_STRIDE,
+    hwaccel: bool = True
+):
     """
     Main data collection loop with smart deduplication.
     
@@ -81,6 +240,12 @@ def collect_vehicle_crops():
     - Max 3 crops per vehicle track
     - Minimum 30-frame spacing per vehicle (prevents instant duplicates)
     - Processes ENTIRE video until the end
+    
+    Args:
+        batch_size: Frames tracked per model call
+        archive: Append crops to tar shards instead of writing one file each
+        stride: Track every Nth frame of the video
+        hwaccel: Try hardware video decoding before falling back to software
     """
     
     print("=" * 80)
@@ -105,6 +270,10 @@ def collect_vehicle_crops():
     print(f"   - Minimum crop size: {MIN_CROP_SIZE}x{MIN_CROP_SIZE} pixels")
     print(f"   - Max crops per vehicle: {MAX_CROPS_PER_VEHICLE}")
     print(f"   - Frame spacing: {FRAME_SPACING} frames (1 second)")
+    print(f"   - Tracking batch size: {batch_size} frames")
+    print(f"   - Frame stride: every {stride} frame(s)")
+    if archive:
+        print(f"   - Output: tar shards of {ARCHIVE_SHARD_SIZE} crops")
     print()
     
     # Load model with tracking
@@ -114,121 +283,204 @@ def collect_vehicle_crops():
     
     # Open video
     print("▶️  Opening video...")
-    cap = cv2.VideoCapture(str(VIDEO_PATH))
+    cap, hw_decode = open_video(VIDEO_PATH, hwaccel)
     if not cap.isOpened():
         print(f"❌ Cannot open video: {VIDEO_PATH}")
         return
+    print(f"   Decoding: {'hardware' if hw_decode else 'software'}")
     
     video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     print(f"✅ Video loaded: {total_frames:,} frames @ {video_fps:.1f} FPS")
     print(f"   Duration: ~{total_frames / video_fps / 60:.1f} minutes\n")
     
-    # Deduplication tracking
-    saved_counts: Dict[int, int] = {}  # track_id -> number of crops saved
-    last_saved_frame: Dict[int, int] = {}  # track_id -> last frame number saved
+    # Deduplication tracking, one slot per track_id + 1 (grown as IDs appear).
+    # New tracks start with no crops and a last save far enough back to allow one now
+    saved_counts, last_saved_frame = _grow_track_state(
+        np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), TRACK_STATE_CAPACITY
+    )
     
     # Statistics
-    frame_idx = 0
+    frame_idx = 0  # Video position of the frame being processed
+    frames_read = 0  # Video position of the next frame to read
+    frames_tracked = 0
+    next_progress = 0
     crop_count = 0
     total_vehicles_detected = 0
-    total_vehicles_skipped = 0
-    skip_reasons = {
-        "too_small": 0,
-        "duplicate_count": 0,
-        "frame_spacing": 0,
-    }
+    skipped_too_small = 0
+    skipped_duplicate_count = 0
+    skipped_frame_spacing = 0
     class_counts = {cid: 0 for cid in VEHICLE_CLASS_IDS}
     unique_vehicle_ids = set()
     
+    # Crop writes overlap with detection on the next frames
+    write_executor = ThreadPoolExecutor(max_workers=WRITE_WORKERS)
+    crop_archive = CropArchive(OUTPUT_DIR, ARCHIVE_SHARD_SIZE) if archive else None
+    pending_writes = []
+    
+    # Bind loop-invariant globals and methods to locals for the per-detection loop
+    min_crop_size = MIN_CROP_SIZE
+    max_crops_per_vehicle = MAX_CROPS_PER_VEHICLE
+    frame_spacing = FRAME_SPACING
+    vehicle_names_get = VEHICLE_NAMES.get
+    output_dir = OUTPUT_DIR
+    submit_write = write_executor.submit
+    
     print("🔍 Processing video frames...")
     print("-" * 80)
     
     start_time = time.time()
     
+    # tqdm rate-limits its own redraws; without it, write a line every 300 frames
+    pbar = tqdm(total=total_frames, unit="f", desc="Frames") if TQDM_AVAILABLE else None
+    
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print()
-                print("⏹️  End of video reached!")
-                break
-            
-            # Progress indicator
-            if frame_idx % 300 == 0:  # Update every 300 frames
-                progress = (frame_idx / total_frames) * 100
-                print(f"\rFrame {frame_idx:,}/{total_frames:,} ({progress:.1f}%) | "
-                      f"Crops collected: {crop_count} | Unique vehicles: {len(unique_vehicle_ids)}", 
-                      end="", flush=True)
+        end_of_video = False
+        while not end_of_video:
+            # Read the next batch of frames, skipping stride - 1 frames after each
+            frames_buf = []
+            frame_indices = []
+            while len(frames_buf) < batch_size and not end_of_video:
+                ret, frame = cap.read()
+                if not ret:
+                    end_of_video = True
+                    break
+                frames_buf.append(frame)
+                frame_indices.append(frames_read)
+                frames_read += 1
+                
+                for _ in range(stride - 1):
+                    if not cap.grab():
+                        end_of_video = True
+                        break
+                    frames_read += 1
             
-            # Detect vehicles with tracking
-            detections = track_vehicles(vehicle_model, frame, confidence=0.5)
+            if not frames_buf:
+                break
             
-            if detections:
-                total_vehicles_detected += len(detections)
+            # Detect vehicles with tracking, one model call per batch
+            batch_detections = track_vehicle_batch(vehicle_model, frames_buf, confidence=0.5)
             
-            # Process each detection
-            for det in detections:
-                track_id = det.track_id
-                x1, y1, x2, y2 = det.bbox
-                crop_w = x2 - x1
-                crop_h = y2 - y1
+            for frame_idx, frame, (track_ids, class_ids, boxes) in zip(
+                frame_indices, frames_buf, batch_detections
+            ):
+                frames_tracked += 1
                 
-                # Initialize tracking for this vehicle if new
-                if track_id not in saved_counts:
-                    saved_counts[track_id] = 0
-                    last_saved_frame[track_id] = -999
+                # Progress indicator
+                if frame_idx >= next_progress:  # Update every 300 frames
+                    next_progress += 300
+                    if pbar is not None:
+                        pbar.set_postfix(crops=crop_count, ids=len(unique_vehicle_ids), refresh=False)
+                    else:
+                        progress = (frame_idx / total_frames) * 100
+                        sys.stderr.write(f"\rFrame {frame_idx:,}/{total_frames:,} ({progress:.1f}%) | "
+                                         f"Crops collected: {crop_count} | Unique vehicles: {len(unique_vehicle_ids)}")
+                        sys.stderr.flush()
+                
+                n = len(track_ids)
+                if n == 0:
+                    continue
+                total_vehicles_detected += n
+                unique_vehicle_ids.update(track_ids.tolist())
                 
-                unique_vehicle_ids.add(track_id)
+                # Per-track state lives in arrays indexed by track_id + 1 (untracked = -1)
+                slots = track_ids + 1
+                if slots.max() >= saved_counts.shape[0]:
+                    saved_counts, last_saved_frame = _grow_track_state(
+                        saved_counts, last_saved_frame, int(slots.max()) + 1
+                    )
                 
                 # ===== FILTER 1: Minimum size =====
-                if crop_w < MIN_CROP_SIZE or crop_h < MIN_CROP_SIZE:
-                    skip_reasons["too_small"] += 1
-                    total_vehicles_skipped += 1
-                    continue
+                wh = boxes[:, 2:] - boxes[:, :2]
+                big_enough = (wh >= min_crop_size).all(axis=1)
                 
                 # ===== FILTER 2: Already saved 3 crops from this vehicle =====
-                if saved_counts[track_id] >= MAX_CROPS_PER_VEHICLE:
-                    skip_reasons["duplicate_count"] += 1
-                    total_vehicles_skipped += 1
-                    continue
+                under_cap = big_enough & (saved_counts[slots] < max_crops_per_vehicle)
                 
                 # ===== FILTER 3: Not enough frames since last save =====
-                frames_since_last_save = frame_idx - last_saved_frame[track_id]
-                if frames_since_last_save < FRAME_SPACING:
-                    skip_reasons["frame_spacing"] += 1
-                    total_vehicles_skipped += 1
-                    continue
-                
-                # ===== SAVE THE CROP =====
-                vehicle_crop = frame[y1:y2, x1:x2].copy()
+                to_save = under_cap & (frame_idx - last_saved_frame[slots] >= frame_spacing)
                 
-                # Filename format: crop_<track_id>_<sequence_number>.jpg
-                sequence_num = saved_counts[track_id] + 1
-                class_name = VEHICLE_NAMES.get(det.class_id, "unknown")
-                filename = f"crop_{track_id:04d}_{sequence_num}_{class_name}.jpg"
-                filepath = OUTPUT_DIR / filename
-                
-                # Save crop
-                success = cv2.imwrite(str(filepath), vehicle_crop)
+                n_big = int(np.count_nonzero(big_enough))
+                n_under_cap = int(np.count_nonzero(under_cap))
+                n_save = int(np.count_nonzero(to_save))
+                skipped_too_small += n - n_big
+                skipped_duplicate_count += n_big - n_under_cap
+                skipped_frame_spacing += n_under_cap - n_save
+                if n_save == 0:
+                    continue
                 
-                if success:
-                    # Update tracking dictionaries
-                    saved_counts[track_id] += 1
-                    last_saved_frame[track_id] = frame_idx
+                # ===== SAVE THE CROPS =====
+                for i in np.flatnonzero(to_save).tolist():
+                    track_id = int(track_ids[i])
+                    class_id = int(class_ids[i])
+                    slot = track_id + 1
+                    
+                    # Untracked boxes all share slot 0, so a save earlier in this
+                    # frame can rule out the next one
+                    if saved_counts[slot] >= max_crops_per_vehicle:
+                        skipped_duplicate_count += 1
+                        continue
+                    if frame_idx - last_saved_frame[slot] < frame_spacing:
+                        skipped_frame_spacing += 1
+                        continue
+                    
+                    x1, y1, x2, y2 = boxes[i].tolist()
+                    
+                    # A view, not a copy: cap.read() returns a new array for every frame,
+                    # so the queued write keeps this frame alive instead of racing it
+                    vehicle_crop = frame[y1:y2, x1:x2]
+                    
+                    # Filename format: crop_<track_id>_<sequence_number>.jpg
+                    sequence_num = int(saved_counts[slot]) + 1
+                    class_name = vehicle_names_get(class_id, "unknown")
+                    filename = f"crop_{track_id:04d}_{sequence_num}_{class_name}.jpg"
+                    filepath = output_dir / filename
+                    
+                    # Save crop in the background; failed writes are counted at the end
+                    pending_writes.append(
+                        (submit_write(write_crop, filepath, vehicle_crop, crop_archive), class_id)
+                    )
+                    
+                    # Update tracking arrays
+                    saved_counts[slot] = sequence_num
+                    last_saved_frame[slot] = frame_idx
                     
                     # Update statistics
                     crop_count += 1
-                    class_counts[det.class_id] = class_counts.get(det.class_id, 0) + 1
+                    class_counts[class_id] = class_counts.get(class_id, 0) + 1
             
-            frame_idx += 1
+            if pbar is not None:
+                pbar.update(frames_read - pbar.n)
+        
+        print()
+        print("⏹️  End of video reached!")
     
     except KeyboardInterrupt:
         print()
         print("\n⚠️  Collection interrupted by user (Ctrl+C)")
     
     finally:
+        if pbar is not None:
+            pbar.close()
         cap.release()
+        write_executor.shutdown(wait=True)
+        if crop_archive is not None:
+            crop_archive.close()
+    
+    skip_reasons = {
+        "too_small": skipped_too_small,
+        "duplicate_count": skipped_duplicate_count,
+        "frame_spacing": skipped_frame_spacing,
+    }
+    total_vehicles_skipped = sum(skip_reasons.values())
+    
+    # Drop crops whose write failed from the statistics
+    failed_writes = 0
+    for future, class_id in pending_writes:
+        if future.exception() is not None or not future.result():
+            failed_writes += 1
+            crop_count -= 1
+            class_counts[class_id] -= 1
     
     elapsed = time.time() - start_time
     
@@ -239,8 +491,10 @@ def collect_vehicle_crops():
     print("📊 COLLECTION SUMMARY")
     print("=" * 80)
     print(f"⏱️  Time elapsed: {elapsed:.1f} seconds ({elapsed/60:.1f} minutes)")
-    print(f"🎬 Frames processed: {frame_idx:,}")
+    print(f"🎬 Frames processed: {frames_read:,} ({frames_tracked:,} tracked)")
     print(f"✅ Crops saved: {crop_count}")
+    if failed_writes:
+        print(f"❌ Failed writes: {failed_writes}")
     print(f"📍 Total vehicle instances detected: {total_vehicles_detected:,}")
     print(f"⏭️  Total skipped: {total_vehicles_skipped:,}")
     print(f"🎯 Unique vehicle tracks: {len(unique_vehicle_ids)}")
@@ -263,7 +517,11 @@ def collect_vehicle_crops():
     
     print(f"💾 Output directory: {OUTPUT_DIR}")
     if crop_count > 0:
-        print(f"📂 Total files: {len(list(OUTPUT_DIR.glob('*.jpg')))}")
+        # Known from the run itself; no need to re-list the output directory
+        if crop_archive is not None:
+            print(f"📦 Tar shards: {crop_archive.shard_idx + 1}")
+        else:
+            print(f"📂 Total files: {crop_count}")
     print()
     
     if crop_count > 0:
@@ -288,4 +546,32 @@ def collect_vehicle_crops():
 
 
 if __name__ == "__main__":
-    collect_vehicle_crops()
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Collect vehicle crops from traffic video for annotation"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BATCH_SIZE,
+        help=f"Frames tracked per model call (default: {BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--stride", type=int, default=FRAME_STRIDE,
+        help=f"Track every Nth frame (default: {FRAME_STRIDE}; 1 = every frame)"
+    )
+    parser.add_argument(
+        "--archive", action="store_true",
+        help=f"Write crops into tar shards of {ARCHIVE_SHARD_SIZE} instead of individual JPEGs"
+    )
+    parser.add_argument(
+        "--no-hwaccel", action="store_true",
+        help="Disable hardware video decoding"
+    )
+    
+    args = parser.parse_args()
+    collect_vehicle_crops(
+        batch_size=max(1, args.batch_size),
+        archive=args.archive,
+        stride=max(1, args.stride),
+        hwaccel=not args.no_hwaccel
+    )
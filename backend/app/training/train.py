@@ -7,7 +7,7 @@ Research Component for University Grading
 This module demonstrates custom object detection model training using:
 - Transfer learning from YOLOv8n pretrained weights
 - Custom dataset preparation with Roboflow
-- CPU-based training for accessibility
+- CPU-based training for accessibility (CUDA + mixed precision when available)
 
 Usage:
     python -m app.training.train
@@ -18,6 +18,7 @@ Output:
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
@@ -28,8 +29,13 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from ultralytics import YOLO
 
 
+@lru_cache(maxsize=1)
 def get_data_yaml_path() -> Path:
-    """Get the absolute path to the data.yaml file."""
+    """
+    Get the absolute path to the data.yaml file.
+    
+    Cached after the first successful lookup (a missing file is not cached).
+    """
     # Dataset is located at: <project_root>/data/plates/data.yaml
     data_yaml = PROJECT_ROOT / "data" / "plates" / "data.yaml"
     
@@ -42,11 +48,23 @@ def get_data_yaml_path() -> Path:
     return data_yaml
 
 
+def resolve_device(device: str = "auto") -> str:
+    """Map 'auto' to 'cuda:0' when a CUDA GPU is available, else 'cpu'."""
+    if device != "auto":
+        return device
+    
+    try:
+        import torch
+        return "cuda:0" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
 def train_plate_detector(
     epochs: int = 10,
     imgsz: int = 640,
-    device: str = "cpu",
-    batch: int = 8,
+    device: str = "auto",
+    batch: int = None,
     pretrained_model: str = "yolov8n.pt",
     project_name: str = "plate_detector",
 ):
@@ -56,8 +74,9 @@ def train_plate_detector(
     Args:
         epochs: Number of training epochs (default: 10 for POC)
         imgsz: Image size for training (default: 640)
-        device: Training device - 'cpu' or 'cuda:0' (default: 'cpu')
-        batch: Batch size (default: 8, reduced for CPU training)
+        device: Training device - 'cpu', 'cuda:0' or 'auto' (default: 'auto',
+            the GPU when CUDA is available)
+        batch: Batch size (default: 32 on GPU, 8 on CPU)
         pretrained_model: Base model to use (default: 'yolov8n.pt')
         project_name: Name for the training run
     
@@ -71,6 +90,11 @@ def train_plate_detector(
     print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
+    device = resolve_device(device)
+    on_gpu = device.startswith("cuda")
+    if batch is None:
+        batch = 32 if on_gpu else 8
+    
     # Get data path
     data_yaml = get_data_yaml_path()
     print(f"📁 Dataset: {data_yaml}")
@@ -91,6 +115,10 @@ def train_plate_detector(
     output_dir = PROJECT_ROOT / "runs" / "detect"
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    # The promoted model may be a hard link to this run's best.pt; unlink it so
+    # the new run writes a fresh file instead of overwriting the promoted one
+    (output_dir / project_name / "weights" / "best.pt").unlink(missing_ok=True)
+    
     # Start training
     print("🚀 Starting training...")
     print("-" * 60)
@@ -126,8 +154,11 @@ def train_plate_detector(
         lrf=0.01,  # Final learning rate factor
         warmup_epochs=1,  # Warmup epochs
         
-        # Workers (reduced for CPU)
-        workers=2,
+        # Mixed precision (Ultralytics only enables it on GPU)
+        amp=True,
+        
+        # Workers (reduced for CPU; the GPU needs more to stay fed)
+        workers=max(4, (os.cpu_count() or 8) // 2) if on_gpu else 2,
     )
     
     print("-" * 60)
@@ -146,14 +177,19 @@ def train_plate_detector(
         print(f"   Box mAP@50: {results.box.map50:.4f}" if hasattr(results, 'box') else "")
         print(f"   Box mAP@50-95: {results.box.map:.4f}" if hasattr(results, 'box') else "")
         
-        # Copy best model to models directory
+        # Promote best model to models directory (hard link, copy across filesystems)
         models_dir = PROJECT_ROOT / "models"
         models_dir.mkdir(exist_ok=True)
         
-        import shutil
         final_model_path = models_dir / "best_plate.pt"
-        shutil.copy(best_model, final_model_path)
-        print(f"📦 Model copied to: {final_model_path}")
+        final_model_path.unlink(missing_ok=True)
+        try:
+            os.link(best_model, final_model_path)
+            print(f"📦 Model linked to: {final_model_path}")
+        except OSError:
+            import shutil
+            shutil.copy(best_model, final_model_path)
+            print(f"📦 Model copied to: {final_model_path}")
     else:
         print("⚠️ Best model not found. Check training logs.")
     
@@ -215,12 +251,12 @@ if __name__ == "__main__":
         help="Image size (default: 640)"
     )
     parser.add_argument(
-        "--batch", type=int, default=8,
-        help="Batch size (default: 8)"
+        "--batch", type=int, default=None,
+        help="Batch size (default: 32 on GPU, 8 on CPU)"
     )
     parser.add_argument(
-        "--device", type=str, default="cpu",
-        help="Device to use: cpu or cuda:0 (default: cpu)"
+        "--device", type=str, default="auto",
+        help="Device to use: cpu, cuda:0 or auto (default: auto)"
     )
     parser.add_argument(
         "--validate", action="store_true",
@@ -3,31 +3,250 @@ Intelligent Traffic Management System - Text-to-Speech Service
 Uses edge-tts for natural voices with pyttsx3 as offline fallback.
 
 Fixed: Thread-safe TTS with queue-based processing to prevent concurrent access issues.
+Requests are served by one long-lived asyncio loop on a dedicated thread:
+synthesis of queued warnings overlaps, playback stays in request order.
 """
 
 import os
 import sys
+import shutil
 import asyncio
 import subprocess
 import traceback
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import threading
-import hashlib
 import queue
+import hashlib
+import functools
+import itertools
+import heapq
+import importlib.util
 import time
+import wave
+
+try:
+    import winsound  # Windows only: in-process WAV playback
+except ImportError:
+    winsound = None
 
 # Determine paths
 TTS_DIR = Path(__file__).parent
 WARNINGS_DIR = TTS_DIR / "warnings"
 
-# TTS Request Queue for thread-safe processing
-_tts_queue: queue.Queue = queue.Queue()
+# Persistent edge-tts output keyed by hash(voice, text); survives warning cleanup
+SYNTH_CACHE_DIR = WARNINGS_DIR / "synth_cache"
+SYNTH_CACHE_MAX_FILES = 200
+
+# Audio files in WARNINGS_DIR, in order of preference when a name has several
+AUDIO_EXTENSIONS = ('.mp3', '.aiff', '.wav')
+DIR_INDEX_TTL = 30.0  # Seconds before the WARNINGS_DIR index is rebuilt
+
+# edge-tts output is constant-bitrate MP3 (audio-24khz-48kbitrate-mono-mp3)
+EDGE_TTS_BYTES_PER_SEC = 48000 / 8
+PLAYBACK_WAIT_MAX = 10.0  # Upper bound on waiting for one clip to finish
+
+# Players that can decode MP3 from stdin, so speech starts while it is synthesized
+STREAM_PLAYERS = (
+    ['mpg123', '-q', '-'],
+    ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'quiet', '-i', '-'],
+)
+
+# TTS request queue, owned by the worker's event loop; other threads post to it
+# through _tts_loop.call_soon_threadsafe
+TTS_QUEUE_SIZE = 16  # When full, the oldest least urgent request is dropped
+TTS_MAX_CONCURRENT_SYNTH = 4  # Requests taken off the queue and synthesized ahead of playback
+TTS_DEDUP_WINDOW = 5.0  # Seconds an identical warning is suppressed after playing
+_tts_loop: Optional[asyncio.AbstractEventLoop] = None
+_tts_queue: Optional[asyncio.PriorityQueue] = None  # (priority, seq, request)
+_tts_seq = itertools.count()  # FIFO tiebreak within a priority
 _tts_worker_started = False
 _tts_worker_stop = False  # Flag to signal worker to stop
 _tts_paused = False  # Flag to pause TTS when no active stream
 _tts_lock = threading.Lock()
+_tts_in_flight: set = set()  # Dedup keys of queued or playing requests
+_tts_active = 0  # Requests the worker is synthesizing or playing
+_tts_recent: Dict[tuple, float] = {}  # Dedup key -> time it finished playing
+
+# Worker error handling: full tracebacks at most once per error type per
+# interval, and edge-tts is skipped for a while after repeated failures
+ERROR_LOG_INTERVAL = 60.0
+EDGE_TTS_FAILURE_LIMIT = 5
+EDGE_TTS_COOLDOWN = 30.0
+_error_last_logged: Dict[str, float] = {}
+
+
+def _log_worker_error(e: Exception):
+    """Print a worker error; the traceback only on the first of its type per interval."""
+    key = type(e).__name__
+    now = time.monotonic()
+    print(f"[TTS Worker] Error: {e}")
+    if now - _error_last_logged.get(key, -ERROR_LOG_INTERVAL) >= ERROR_LOG_INTERVAL:
+        _error_last_logged[key] = now
+        traceback.print_exc()
+
+
+# Lower is spoken first; violations jump ahead of informational messages
+PRIORITY_VIOLATION = 1
+PRIORITY_NORMAL = 5
+_PRIORITY_SHUTDOWN = -1
+
+
+# Warning text is a small recurring set, so hashes are memoized
+@functools.lru_cache(maxsize=512)
+def _hash_text(text: str) -> str:
+    """Hash for caching text-based lookups."""
+    return hashlib.md5(text.lower().strip().encode()).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=512)
+def _synth_cache_key(voice: str, text: str) -> str:
+    """Synthesis cache key for one (voice, text) pair."""
+    return hashlib.sha1(f"{voice}|{text}".encode()).hexdigest()[:20]
+
+
+class _Pyttsx3Thread(threading.Thread):
+    """
+    Owns the one pyttsx3 engine; every engine call runs on this thread.
+    
+    The engine is initialized once (COM/driver setup and voice enumeration)
+    instead of per utterance, and SAPI5's thread affinity is respected, which
+    is what made per-call engines necessary to avoid hangs.
+    """
+    
+    def __init__(self):
+        super().__init__(name="pyttsx3-engine", daemon=True)
+        self.q: "queue.Queue" = queue.Queue()
+    
+    def run(self):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', 150)
+            engine.setProperty('volume', 0.9)
+        except Exception as e:
+            print(f"[TTS] Could not init pyttsx3: {e}")
+            engine = None
+        
+        while True:
+            job, done, result = self.q.get()
+            try:
+                if engine is not None:
+                    job(engine)
+                    result.append(True)
+            except Exception as e:
+                print(f"[TTS] pyttsx3 failed: {e}")
+            finally:
+                done.set()
+    
+    def submit(self, job, wait: bool = True) -> bool:
+        """Run job(engine) on the engine thread; True if it ran without error."""
+        done = threading.Event()
+        result = []
+        self.q.put((job, done, result))
+        if not wait:
+            return True
+        done.wait()
+        return bool(result)
+
+
+_pyttsx3_thread: Optional[_Pyttsx3Thread] = None
+
+
+def _get_pyttsx3_thread() -> _Pyttsx3Thread:
+    """Start the pyttsx3 engine thread on first use."""
+    global _pyttsx3_thread
+    with _tts_lock:
+        if _pyttsx3_thread is None:
+            _pyttsx3_thread = _Pyttsx3Thread()
+            _pyttsx3_thread.start()
+        return _pyttsx3_thread
+
+
+def _speak_job(text: str):
+    """Engine job that speaks text and blocks until done."""
+    def _job(engine):
+        engine.say(text)
+        engine.runAndWait()
+    return _job
+
+
+def _post_to_tts_loop(callback, *args) -> bool:
+    """Run callback(*args) on the TTS worker loop; False if the worker is not running."""
+    loop = _tts_loop
+    if loop is None or loop.is_closed():
+        return False
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+        return True
+    except RuntimeError:  # Loop closed concurrently
+        return False
+
+
+def _dedup_key(text: str, filename: Optional[str]) -> tuple:
+    """Identity of a warning for coalescing duplicates."""
+    return (_hash_text(text), filename)
+
+
+def _claim_request(key: tuple) -> bool:
+    """Mark key in flight; False if it is already queued/playing or just played."""
+    now = time.time()
+    with _tts_lock:
+        if key in _tts_in_flight or now - _tts_recent.get(key, 0.0) < TTS_DEDUP_WINDOW:
+            return False
+        _tts_in_flight.add(key)
+        return True
+
+
+def _release_request(request, played: bool = False):
+    """Clear a request's in-flight mark, remembering when it played."""
+    key = _dedup_key(request[0], request[1])
+    with _tts_lock:
+        _tts_in_flight.discard(key)
+        if played:
+            now = time.time()
+            _tts_recent[key] = now
+            if len(_tts_recent) > 256:
+                for k in [k for k, t in _tts_recent.items() if now - t >= TTS_DEDUP_WINDOW]:
+                    del _tts_recent[k]
+
+
+def _enqueue_request(request, priority: int = PRIORITY_NORMAL):
+    """Queue a request; None is the shutdown signal (runs on the worker loop)."""
+    item = (_PRIORITY_SHUTDOWN if request is None else priority, next(_tts_seq), request)
+    
+    if _tts_queue.full():
+        # Drop the oldest of the least urgent requests, which may be this one.
+        # The shutdown signal is never dropped.
+        pending = [_tts_queue.get_nowait() for _ in range(_tts_queue.qsize())]
+        victim = max(pending + [item], key=lambda it: (it[0], -it[1]))
+        for it in pending:
+            if it is not victim:
+                _tts_queue.put_nowait(it)
+        if victim[2] is not None:
+            print(f"[TTS] ⚠️ Queue full, dropping: {victim[2][0][:30]}...")
+            _release_request(victim[2])
+        if victim is item:
+            return
+    
+    _tts_queue.put_nowait(item)
+
+
+def _drain_queue():
+    """Drop all pending requests (runs on the worker loop)."""
+    if _tts_queue.empty():
+        return
+    
+    # Empty the queue in one pass (no await, so nothing interleaves), then
+    # clear every in-flight mark under a single lock acquisition
+    pending = [_tts_queue.get_nowait()[2] for _ in range(_tts_queue.qsize())]
+    keys = [_dedup_key(req[0], req[1]) for req in pending if req is not None]
+    with _tts_lock:
+        _tts_in_flight.difference_update(keys)
+    
+    if None in pending:  # Keep a pending shutdown signal
+        _tts_queue.put_nowait((_PRIORITY_SHUTDOWN, next(_tts_seq), None))
 
 
 def set_tts_paused(paused: bool):
@@ -36,12 +255,7 @@ def set_tts_paused(paused: bool):
     _tts_paused = paused
     if paused:
         # Clear the queue when pausing to stop pending announcements
-        while not _tts_queue.empty():
-            try:
-                _tts_queue.get_nowait()
-                _tts_queue.task_done()
-            except:
-                break
+        _post_to_tts_loop(_drain_queue)
         print("[TTS] ⏸️ TTS paused - no active stream")
     else:
         print("[TTS] ▶️ TTS resumed - stream active")
@@ -59,6 +273,36 @@ COMMON_WARNINGS: Dict[str, str] = {
     "general_warning": "Traffic violation detected.",
 }
 
+# Text hash -> COMMON_WARNINGS key, to spot common warnings when they are requested
+_COMMON_WARNING_BY_HASH: Dict[str, str] = {
+    _hash_text(text): key for key, text in COMMON_WARNINGS.items()
+}
+
+
+def _cached_warning_key(service, request) -> Optional[str]:
+    """COMMON_WARNINGS key of a request that can play a preloaded file, else None."""
+    text, filename, play_immediately, _, segments = request
+    if filename is not None or segments is not None or not play_immediately:
+        return None
+    warning_key = _COMMON_WARNING_BY_HASH.get(_hash_text(text))
+    return warning_key if warning_key in service._warning_cache else None
+
+
+# Dynamic warnings as (prefix, suffix) around a value such as a plate. The
+# constant parts are synthesized once and spliced around the value's audio
+# (MP3 frames concatenate cleanly), so only the value goes to edge-tts.
+WARNING_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    "parking_move": ("", ", please move immediately. You are in a no parking zone."),
+    "parking_fine": ("Violation recorded for ", ". Fine has been issued."),
+}
+
+
+def _template_segments(template_key: str, value: str) -> Tuple[str, Tuple[str, ...]]:
+    """Full text of a templated warning and the phrases it is spliced from."""
+    prefix, suffix = WARNING_TEMPLATES[template_key]
+    parts = (prefix.strip(), value.strip(), suffix.lstrip(" ,.").strip())
+    return prefix + value + suffix, tuple(p for p in parts if p)
+
 
 class TTSService:
     """
@@ -78,10 +322,17 @@ class TTSService:
         self.voice = voice
         self._ensure_directories()
         self._edge_tts_available = self._check_edge_tts()
+        self._edge_tts_failures = 0  # Consecutive failed syntheses
+        self._edge_tts_skip_until = 0.0  # monotonic time edge-tts is retried after
         self._pyttsx3_available = self._check_pyttsx3()
-        self._pyttsx3_engine = None
-        self._pyttsx3_lock = threading.Lock()  # Lock for pyttsx3 engine access
+        self._stream_player_cmd = self._find_stream_player()
         self._warning_cache: Dict[str, Path] = {}  # text_hash -> filepath
+        self._warning_bytes: Dict[str, bytes] = {}  # warning_key -> audio played from memory
+        self._pcm: Dict[str, tuple] = {}  # warning_key -> (int16 samples, sample rate)
+        self._synth_cache: Dict[str, Path] = {}  # hash(voice, text) -> cached mp3, oldest first
+        self._synth_cache_lock = threading.Lock()
+        self._dir_index: Dict[str, Path] = {}  # file stem -> audio file in WARNINGS_DIR
+        self._dir_index_time = 0.0
         self._last_play_time = 0  # Track last audio play time
         
         print(f"🔊 TTS Service initialized")
@@ -89,12 +340,16 @@ class TTSService:
         print(f"   Warnings dir: {WARNINGS_DIR}")
         print(f"   edge-tts: {self._edge_tts_available}")
         print(f"   pyttsx3: {self._pyttsx3_available}")
+        print(f"   stream player: {self._stream_player_cmd[0] if self._stream_player_cmd else None}")
         
         # Start the TTS worker thread
         self._start_tts_worker()
         
         # Pre-load cached warning files
         self._preload_common_warnings()
+        
+        # Synthesize the constant parts of templated warnings in the background
+        self._presynthesize_templates()
     
     def _start_tts_worker(self):
         """Start the background TTS worker thread (singleton pattern)."""
@@ -105,83 +360,162 @@ class TTSService:
                 return
             _tts_worker_started = True
         
-        def _worker():
-            """Process TTS requests from the queue sequentially."""
-            global _tts_worker_stop
+        ready = threading.Event()
+        
+        def _speak_with_pyttsx3(text_to_speak):
+            """Speak text on the shared pyttsx3 engine thread and wait for it."""
+            return _get_pyttsx3_thread().submit(_speak_job(text_to_speak))
+        
+        async def _prepare(request, stream):
+            """
+            Synthesize one request ahead of its turn.
             
-            def _speak_with_pyttsx3(text_to_speak):
-                """Speak text using a FRESH pyttsx3 engine each time (fixes Windows SAPI5 hanging)."""
-                try:
-                    import pyttsx3
-                    # Create a NEW engine for each message - this prevents SAPI5 from hanging
-                    engine = pyttsx3.init()
-                    engine.setProperty('rate', 150)
-                    engine.setProperty('volume', 0.9)
-                    engine.say(text_to_speak)
-                    engine.runAndWait()
-                    engine.stop()  # Explicitly stop
-                    del engine  # Clean up
-                    return True
-                except Exception as e:
-                    print(f"[TTS Worker] pyttsx3 speak failed: {e}")
-                    return False
+            With stream=True the speaker is free and nothing else is waiting,
+            so a new phrase is played while it is synthesized.
             
-            while not _tts_worker_stop:
-                try:
-                    # Short timeout for responsive shutdown
+            Returns:
+                (synthesized file or None, True if it was already streamed)
+            """
+            text, filename, play_immediately, service_ref, segments = request
+            filepath = None
+            spoken = False
+            
+            # A common warning with a preloaded file needs no synthesis
+            warning_key = _cached_warning_key(service_ref, request)
+            if warning_key is not None:
+                return service_ref._warning_cache[warning_key], False
+            
+            if service_ref._edge_tts_usable() and play_immediately:
+                if (stream and filename is None and segments is None and not _tts_paused
+                        and service_ref.can_stream(text)):
                     try:
-                        request = _tts_queue.get(timeout=1)
-                    except queue.Empty:
-                        continue
-                    
-                    if request is None:  # Shutdown signal
-                        break
-                    
-                    # Skip TTS if paused (no active stream)
-                    if _tts_paused:
-                        _tts_queue.task_done()
-                        continue
-                    
-                    text, filename, play_immediately, service_ref = request
-                    
-                    spoken = False
-                    filepath = None
-                    
-                    # Try edge-tts first (in a new event loop for this thread)
-                    if service_ref._edge_tts_available and play_immediately:
+                        spoken = await service_ref.stream_warning_async(text)
+                    except Exception:
+                        spoken = False
+                
+                if not spoken:
+                    try:
+                        if segments is not None:
+                            filepath = await service_ref.generate_spliced_async(text, segments)
+                        else:
+                            filepath = await service_ref.generate_warning_async(text, filename)
+                    except Exception:
+                        filepath = None  # Silently fail, will use pyttsx3
+            
+            # Windows: make the WAV copy winsound plays while earlier warnings are still playing
+            if filepath is not None and winsound is not None:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, service_ref._convert_to_wav, filepath)
+            
+            return filepath, spoken
+        
+        async def _play(request, prepared):
+            """Play a request once its synthesis is done, falling back to pyttsx3."""
+            global _tts_active
+            text, filename, play_immediately, service_ref, segments = request
+            loop = asyncio.get_running_loop()
+            spoken = False  # Only warnings actually heard start the dedup window
+            
+            try:
+                filepath, spoken = await prepared
+                if _tts_paused:
+                    return
+                
+                if spoken:
+                    service_ref._last_play_time = time.time()
+                elif filepath and filepath.exists():
+                    warning_key = _cached_warning_key(service_ref, request)
+                    if warning_key is not None:
+                        # Preloaded common warning: played from memory where possible
+                        started, proc = service_ref.play_cached_warning(warning_key), None
+                    else:
+                        # Play the edge-tts generated file
+                        started, proc = service_ref._start_playback(filepath)
+                    spoken = started
+                    if proc is not None:
+                        # Hand the speaker on the moment the player exits
                         try:
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            try:
-                                filepath = loop.run_until_complete(
-                                    service_ref.generate_warning_async(text, filename)
-                                )
-                                if filepath and filepath.exists():
-                                    # Play the edge-tts generated file
-                                    service_ref.play_audio(filepath)
-                                    spoken = True
-                                    time.sleep(3.0)  # Wait for audio to finish
-                            finally:
-                                loop.close()
-                        except Exception:
-                            pass  # Silently fail, will use pyttsx3
-                    
-                    # Fallback to pyttsx3 direct speech
-                    if not spoken and play_immediately and service_ref._pyttsx3_available:
-                        print(f"[TTS Worker] 🔊 Speaking: {text[:45]}...")
-                        if _speak_with_pyttsx3(text):
-                            print(f"[TTS Worker] ✅ Spoke successfully")
-                            spoken = True
-                            service_ref._last_play_time = time.time()
-                    
-                    _tts_queue.task_done()
-                    
-                except Exception as e:
-                    print(f"[TTS Worker] Error: {e}")
-                    traceback.print_exc()
+                            await asyncio.wait_for(
+                                loop.run_in_executor(None, proc.wait), PLAYBACK_WAIT_MAX
+                            )
+                        except asyncio.TimeoutError:
+                            pass
+                    elif started:
+                        # No process to wait on: wait out the clip's length
+                        duration = service_ref._clip_duration(filepath, warning_key)
+                        await asyncio.sleep(min(duration + 0.15, PLAYBACK_WAIT_MAX))
+                
+                # Fallback to pyttsx3 direct speech
+                if not spoken and play_immediately and service_ref._pyttsx3_available:
+                    print(f"[TTS Worker] 🔊 Speaking: {text[:45]}...")
+                    if await loop.run_in_executor(None, _speak_with_pyttsx3, text):
+                        print(f"[TTS Worker] ✅ Spoke successfully")
+                        service_ref._last_play_time = time.time()
+                        spoken = True
+                
+            except Exception as e:
+                _log_worker_error(e)
+            
+            finally:
+                _tts_active -= 1
+                _release_request(request, played=spoken)
+        
+        async def _async_worker():
+            """
+            Play requests one at a time, most urgent first.
+            
+            Up to TTS_MAX_CONCURRENT_SYNTH requests are taken off the queue
+            and synthesized ahead; the next one to play is picked by priority
+            only when the speaker frees up, so a violation queued behind a
+            backlog plays right after the current clip.
+            """
+            global _tts_loop, _tts_queue, _tts_active
+            
+            _tts_queue = asyncio.PriorityQueue(maxsize=TTS_QUEUE_SIZE)
+            _tts_loop = asyncio.get_running_loop()
+            ready.set()
+            
+            lookahead = []  # Heap of (priority, seq, request, synthesis task)
+            
+            while not _tts_worker_stop:
+                # Block only when there is nothing to play; otherwise top up
+                taken = [] if lookahead else [await _tts_queue.get()]
+                while len(lookahead) + len(taken) < TTS_MAX_CONCURRENT_SYNTH and not _tts_queue.empty():
+                    taken.append(_tts_queue.get_nowait())
+                
+                stream = not lookahead and len(taken) == 1
+                shutdown = False
+                for priority, seq, request in taken:
+                    if request is None:  # Shutdown signal
+                        shutdown = True
+                    elif _tts_paused:  # Skip TTS if paused (no active stream)
+                        _release_request(request)
+                    else:
+                        task = _tts_loop.create_task(_prepare(request, stream))
+                        heapq.heappush(lookahead, (priority, seq, request, task))
+                        _tts_active += 1
+                
+                if shutdown:
+                    for _, _, request, task in lookahead:
+                        task.cancel()
+                        _tts_active -= 1
+                        _release_request(request)
+                    break
+                
+                if lookahead:
+                    _, _, request, task = heapq.heappop(lookahead)
+                    await _play(request, task)
+        
+        def _worker():
+            """Run the TTS event loop for the life of the process."""
+            try:
+                asyncio.run(_async_worker())
+            finally:
+                ready.set()
         
         worker_thread = threading.Thread(target=_worker, daemon=True, name="TTSWorker")
         worker_thread.start()
+        ready.wait(timeout=5)
         print("   🧵 TTS Worker thread started")
     
     def _preload_common_warnings(self):
@@ -190,20 +524,190 @@ class TTSService:
             return
         
         # Look for common warning files (support multiple formats for cross-platform)
-        audio_extensions = ['.mp3', '.aiff', '.wav']
+        index = self._get_dir_index()
         for warning_key, text in COMMON_WARNINGS.items():
-            for ext in audio_extensions:
-                filepath = WARNINGS_DIR / f"{warning_key}{ext}"
-                if filepath.exists():
-                    text_hash = self._hash_text(text)
-                    self._warning_cache[text_hash] = filepath
-                    self._warning_cache[warning_key] = filepath
-                    print(f"   📦 Cached: {filepath.name}")
-                    break  # Use first found format
+            filepath = index.get(warning_key)
+            if filepath is not None:
+                if winsound is not None and filepath.suffix != ".wav":
+                    filepath = self._convert_to_wav(filepath)
+                text_hash = self._hash_text(text)
+                self._warning_cache[text_hash] = filepath
+                self._warning_cache[warning_key] = filepath
+                if self._can_play_bytes(filepath.suffix):
+                    self._warning_bytes[warning_key] = filepath.read_bytes()
+                pcm = self._decode_pcm(filepath)
+                if pcm is not None:
+                    self._pcm[warning_key] = pcm
+                print(f"   📦 Cached: {filepath.name}")
+        
+        # Index the synthesis cache once (one scandir pass), oldest first
+        if SYNTH_CACHE_DIR.exists():
+            with os.scandir(SYNTH_CACHE_DIR) as entries:
+                cached = []
+                for entry in entries:
+                    if entry.name.endswith(".mp3") and entry.is_file():
+                        st = entry.stat()
+                        if st.st_size > 0:
+                            cached.append((st.st_mtime, Path(entry.path)))
+            cached.sort()
+            with self._synth_cache_lock:
+                for _, f in cached:
+                    self._synth_cache[f.stem] = f
+            if cached:
+                print(f"   📦 Synthesis cache: {len(cached)} phrases")
+    
+    def _decode_pcm(self, filepath: Path) -> Optional[tuple]:
+        """
+        Decode an audio file once to int16 PCM for sounddevice playback.
+        
+        Returns:
+            (samples, sample rate), or None if soundfile/sounddevice are
+            not installed or the format can't be decoded
+        """
+        if importlib.util.find_spec("sounddevice") is None:
+            return None
+        try:
+            import soundfile as sf
+            data, sr = sf.read(str(filepath), dtype="int16")
+            return data, sr
+        except Exception:
+            return None
+    
+    def play_pcm(self, warning_key: str) -> bool:
+        """Play a preloaded, already decoded warning (no decoder, no process)."""
+        pcm = self._pcm.get(warning_key)
+        if pcm is None:
+            return False
+        try:
+            import sounddevice as sd
+            sd.play(*pcm)  # Returns immediately; playback runs in PortAudio's thread
+            print(f"[TTS] 🔊 Playing PCM: {warning_key}")
+            return True
+        except Exception as e:
+            print(f"[TTS] ⚠️ PCM playback failed: {e}")
+            return False
+    
+    def _clip_duration(self, filepath: Path, warning_key: Optional[str] = None) -> float:
+        """Seconds a clip plays for, to wait it out when there is no player process."""
+        pcm = self._pcm.get(warning_key)
+        if pcm is not None:
+            return len(pcm[0]) / pcm[1]
+        if filepath.suffix == ".wav":
+            try:
+                with wave.open(str(filepath), "rb") as w:
+                    return w.getnframes() / w.getframerate()
+            except (OSError, wave.Error, ZeroDivisionError):
+                pass
+            mp3_path = filepath.with_suffix(".mp3")  # winsound copy of an edge-tts MP3
+            if mp3_path.exists():
+                filepath = mp3_path
+        return filepath.stat().st_size / EDGE_TTS_BYTES_PER_SEC
+    
+    def _get_dir_index(self) -> Dict[str, Path]:
+        """
+        Audio files in WARNINGS_DIR by stem, from one os.scandir pass.
+        
+        Rebuilt at most every DIR_INDEX_TTL seconds, so lookups are dict
+        hits instead of a stat() per candidate name and extension.
+        """
+        now = time.time()
+        if now - self._dir_index_time < DIR_INDEX_TTL:
+            return self._dir_index
+        
+        index: Dict[str, Path] = {}
+        rank: Dict[str, int] = {}
+        try:
+            with os.scandir(WARNINGS_DIR) as entries:
+                for entry in entries:
+                    stem, dot, ext = entry.name.rpartition('.')
+                    if not dot or f".{ext}" not in AUDIO_EXTENSIONS or not entry.is_file():
+                        continue
+                    r = AUDIO_EXTENSIONS.index(f".{ext}")
+                    if r < rank.get(stem, len(AUDIO_EXTENSIONS)):
+                        index[stem] = Path(entry.path)
+                        rank[stem] = r
+        except OSError:
+            pass
+        
+        self._dir_index = index
+        self._dir_index_time = now
+        return index
+    
+    def _presynthesize_templates(self):
+        """Queue synthesis of every template prefix/suffix on the worker loop."""
+        loop = _tts_loop
+        if not self._edge_tts_available or loop is None or loop.is_closed():
+            return
+        
+        async def _warm():
+            if _tts_paused:
+                return  # Segments are synthesized on first use instead
+            for template_key in WARNING_TEMPLATES:
+                for phrase in _template_segments(template_key, "")[1]:
+                    await self.generate_warning_async(phrase)
+        
+        asyncio.run_coroutine_threadsafe(_warm(), loop)
+    
+    def _convert_to_wav(self, filepath: Path) -> Path:
+        """WAV copy of filepath for winsound, converted once; filepath if it can't be."""
+        wav_path = filepath.with_suffix(".wav")
+        if wav_path.exists():
+            return wav_path
+        try:
+            from pydub import AudioSegment  # Optional, needs ffmpeg
+        except ImportError:
+            return filepath
+        try:
+            AudioSegment.from_file(str(filepath)).export(str(wav_path), format="wav")
+            return wav_path
+        except Exception as e:
+            print(f"[TTS] ⚠️ WAV conversion failed for {filepath.name}: {e}")
+            return filepath
     
     def _hash_text(self, text: str) -> str:
         """Generate a hash for caching text-based lookups."""
-        return hashlib.md5(text.lower().strip().encode()).hexdigest()[:16]
+        return _hash_text(text)
+    
+    def _synth_cache_key(self, text: str) -> str:
+        """Cache key for one (voice, text) pair."""
+        return _synth_cache_key(self.voice, text)
+    
+    def _synth_cache_get(self, key: str) -> Optional[Path]:
+        """
+        Cached synthesis for key, refreshed as most recently used.
+        
+        Files are named by the (voice, text) hash, so SYNTH_CACHE_DIR is
+        itself the shared index: on a miss the file is looked up on disk,
+        picking up phrases synthesized by other worker processes (or before
+        a reload) without calling edge-tts again.
+        """
+        with self._synth_cache_lock:
+            path = self._synth_cache.pop(key, None)
+            if path is not None:
+                self._synth_cache[key] = path
+                return path
+        
+        path = SYNTH_CACHE_DIR / f"{key}.mp3"
+        try:
+            if path.stat().st_size == 0:
+                return None
+        except OSError:
+            return None
+        with self._synth_cache_lock:
+            self._synth_cache[key] = path
+        return path
+    
+    def _synth_cache_put(self, key: str, path: Path):
+        """Register a cached synthesis, evicting the least recently used files."""
+        with self._synth_cache_lock:
+            self._synth_cache[key] = path
+            while len(self._synth_cache) > SYNTH_CACHE_MAX_FILES:
+                old = self._synth_cache.pop(next(iter(self._synth_cache)))
+                for f in (old, old.with_suffix(".wav")):  # WAV copy made for winsound
+                    try:
+                        f.unlink()
+                    except OSError:
+                        pass
     
     def play_cached_warning(self, warning_key: str) -> bool:
         """
@@ -216,41 +720,36 @@ class TTSService:
         Returns:
             True if played successfully
         """
+        # Decoded once at startup: no decoder or player process per play
+        if self.play_pcm(warning_key):
+            return True
+        
+        # Preloaded audio is played from memory, no file open per play
+        buf = self._warning_bytes.get(warning_key)
+        if buf is not None and self.play_audio_bytes(buf):
+            return True
+        
         # First check direct key lookup
         if warning_key in self._warning_cache:
             return self.play_audio(self._warning_cache[warning_key])
         
-        # Try to find the file with various extensions (cross-platform support)
-        audio_extensions = ['.mp3', '.aiff', '.wav']
-        for ext in audio_extensions:
-            filepath = WARNINGS_DIR / f"{warning_key}{ext}"
-            if filepath.exists():
+        # Then the directory index: exact name, then alternative naming patterns
+        index = self._get_dir_index()
+        for name in (warning_key, f"{warning_key}_test", f"warning_{warning_key}"):
+            filepath = index.get(name)
+            if filepath is not None:
                 self._warning_cache[warning_key] = filepath
                 return self.play_audio(filepath)
         
-        # Try alternative naming patterns
-        alt_patterns = [
-            f"{warning_key}_test",
-            f"warning_{warning_key}",
-        ]
-        for pattern in alt_patterns:
-            for ext in audio_extensions:
-                alt_path = WARNINGS_DIR / f"{pattern}{ext}"
-                if alt_path.exists():
-                    self._warning_cache[warning_key] = alt_path
-                    return self.play_audio(alt_path)
-        
         print(f"[TTS] ⚠️ No cached audio for: {warning_key}")
         return False
     
     def play_any_warning(self) -> bool:
         """Play any available warning file (for testing)."""
-        if WARNINGS_DIR.exists():
-            # Search for any audio file (cross-platform)
-            for ext in ['*.mp3', '*.aiff', '*.wav']:
-                files = list(WARNINGS_DIR.glob(ext))
-                if files:
-                    return self.play_audio(files[0])
+        # Any audio file (cross-platform), from the directory index
+        filepath = next(iter(self._get_dir_index().values()), None)
+        if filepath is not None:
+            return self.play_audio(filepath)
         return False
     
     def _ensure_directories(self):
@@ -260,93 +759,217 @@ class TTSService:
             print(f"📁 Created warnings directory: {WARNINGS_DIR}")
     
     def _check_edge_tts(self) -> bool:
-        """Check if edge-tts is installed."""
-        try:
-            import edge_tts
-            return True
-        except ImportError:
-            return False
+        """Check if edge-tts is installed (imported on first synthesis)."""
+        return importlib.util.find_spec("edge_tts") is not None
     
-    def _check_pyttsx3(self) -> bool:
-        """Check if pyttsx3 is installed."""
-        try:
-            import pyttsx3
-            return True
-        except ImportError:
-            return False
+    def _find_stream_player(self) -> Optional[List[str]]:
+        """First installed player that reads MP3 from stdin (not used on Windows)."""
+        if sys.platform == "win32":
+            return None
+        for cmd in STREAM_PLAYERS:
+            if shutil.which(cmd[0]):
+                return cmd
+        return None
     
-    def _get_pyttsx3_engine(self):
-        """Get or create pyttsx3 engine (lazy initialization)."""
-        if self._pyttsx3_engine is None and self._pyttsx3_available:
-            try:
-                import pyttsx3
-                self._pyttsx3_engine = pyttsx3.init()
-                self._pyttsx3_engine.setProperty('rate', 150)
-                self._pyttsx3_engine.setProperty('volume', 0.9)
-            except Exception as e:
-                print(f"[TTS] Could not init pyttsx3: {e}")
-        return self._pyttsx3_engine
+    def can_stream(self, text: str) -> bool:
+        """True if text would be synthesized (not cached) and a stdin player exists."""
+        return (
+            self._stream_player_cmd is not None
+            and self._edge_tts_usable()
+            and self._synth_cache_get(self._synth_cache_key(text)) is None
+        )
+    
+    def _check_pyttsx3(self) -> bool:
+        """Check if pyttsx3 is installed (imported by the engine thread on first use)."""
+        return importlib.util.find_spec("pyttsx3") is not None
     
     async def generate_warning_async(
         self, 
         text: str, 
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        player: Optional[asyncio.subprocess.Process] = None
     ) -> Optional[Path]:
         """
         Generate a warning audio file asynchronously.
         
+        Without a filename the result goes to the synthesis cache, so a
+        phrase already spoken with this voice is returned without calling
+        edge-tts again.
+        
         Args:
             text: The text to convert to speech
             filename: Optional filename (without extension). 
-                      If None, generates timestamp-based name.
+                      If None, uses the (voice, text) synthesis cache.
+            player: Optional player process; audio chunks are also fed
+                    to its stdin as they arrive
         
         Returns:
             Path to the generated MP3 file, or None if failed
         """
+        cache_key = None
+        if filename is None:
+            cache_key = self._synth_cache_key(text)
+            cached = self._synth_cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
         if not self._edge_tts_available:
             print(f"[TTS] ⚠️ edge-tts not available. Would say: {text}")
             return None
         
+        tmp_path = None
         try:
             import edge_tts
             
-            # Generate filename if not provided
-            if filename is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                filename = f"warning_{timestamp}"
-            
-            # Ensure .mp3 extension
-            if not filename.endswith(".mp3"):
-                filename = f"{filename}.mp3"
+            if cache_key is not None:
+                SYNTH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                filepath = SYNTH_CACHE_DIR / f"{cache_key}.mp3"
+            else:
+                # Ensure .mp3 extension
+                if not filename.endswith(".mp3"):
+                    filename = f"{filename}.mp3"
+                filepath = WARNINGS_DIR / filename
             
-            filepath = WARNINGS_DIR / filename
+            # Write to a temp name and rename, so a half-written file is never served
+            tmp_path = filepath.with_name(filepath.name + ".part")
             
             # Generate audio using subprocesses method for reliability
             communicate = edge_tts.Communicate(text, self.voice)
             
             # Use iterate and write manually for more reliability
-            with open(str(filepath), "wb") as f:
+            size = 0
+            with open(str(tmp_path), "wb") as f:
                 async for chunk in communicate.stream():
                     if chunk["type"] == "audio":
                         f.write(chunk["data"])
+                        size += len(chunk["data"])
+                        if player is not None:
+                            try:
+                                player.stdin.write(chunk["data"])
+                                await player.stdin.drain()
+                            except (BrokenPipeError, ConnectionResetError):
+                                player = None  # Player gone; keep writing the file
             
             # Check if file was actually written
-            if filepath.exists() and filepath.stat().st_size > 0:
-                print(f"[TTS] ✅ Generated: {filepath.name} ({filepath.stat().st_size} bytes)")
+            if size > 0:
+                os.replace(tmp_path, filepath)
+                self._edge_tts_failures = 0
+                if cache_key is not None:
+                    self._synth_cache_put(cache_key, filepath)
+                print(f"[TTS] ✅ Generated: {filepath.name} ({size} bytes)")
                 return filepath
             else:
+                tmp_path.unlink(missing_ok=True)
                 print(f"[TTS] ⚠️ File empty or not created")
+                self._record_edge_tts_failure()
                 return None
             
-        except Exception as e:
-            # Silently fail - pyttsx3 fallback will handle it
+        except asyncio.CancelledError:
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            raise
+        except Exception:
+            # Silently fail - pyttsx3 fallback will handle it; drop any partial file
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            self._record_edge_tts_failure()
             return None
     
+    def _edge_tts_usable(self) -> bool:
+        """edge-tts is installed and not in a post-failure cooldown."""
+        return self._edge_tts_available and time.monotonic() >= self._edge_tts_skip_until
+    
+    def _record_edge_tts_failure(self):
+        """Count a failed synthesis; after too many in a row, skip edge-tts for a while."""
+        self._edge_tts_failures += 1
+        if self._edge_tts_failures >= EDGE_TTS_FAILURE_LIMIT:
+            self._edge_tts_failures = 0
+            self._edge_tts_skip_until = time.monotonic() + EDGE_TTS_COOLDOWN
+            print(f"[TTS] ⚠️ edge-tts failing, using pyttsx3 for {EDGE_TTS_COOLDOWN:.0f}s")
+    
+    async def generate_spliced_async(self, text: str, segments: Tuple[str, ...]) -> Optional[Path]:
+        """
+        Build the audio for text by concatenating the audio of its segments.
+        
+        Each segment goes through the synthesis cache, so template prefixes
+        and suffixes (and repeated plates) are never sent to edge-tts twice.
+        The spliced result is cached under the full text.
+        
+        Returns:
+            Path to the spliced MP3 file, or None if any segment failed
+        """
+        cache_key = self._synth_cache_key(text)
+        cached = self._synth_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        parts = await asyncio.gather(*(self.generate_warning_async(seg) for seg in segments))
+        if any(p is None for p in parts):
+            return None
+        
+        filepath = SYNTH_CACHE_DIR / f"{cache_key}.mp3"
+        tmp_path = filepath.with_name(filepath.name + ".part")
+        try:
+            SYNTH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(str(tmp_path), "wb") as f:
+                for p in parts:
+                    f.write(p.read_bytes())
+            os.replace(tmp_path, filepath)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            print(f"[TTS] ⚠️ Could not splice warning: {e}")
+            return None
+        
+        self._synth_cache_put(cache_key, filepath)
+        print(f"[TTS] ✅ Spliced: {filepath.name} ({len(segments)} segments)")
+        return filepath
+    
+    async def stream_warning_async(self, text: str) -> bool:
+        """
+        Synthesize text and play it at the same time.
+        
+        Audio chunks go to a stdin player (mpg123/ffplay) as edge-tts
+        produces them and to the synthesis cache, so the first words play
+        before synthesis ends and there is no write-then-read round trip.
+        
+        Returns:
+            True once the player has finished the whole phrase
+        """
+        if self._stream_player_cmd is None:
+            return False
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self._stream_player_cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            print(f"[TTS] ⚠️ Stream player failed to start: {e}")
+            return False
+        
+        try:
+            filepath = await self.generate_warning_async(text, player=proc)
+        finally:
+            proc.stdin.close()
+        
+        if filepath is None:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            return False
+        
+        await proc.wait()
+        print(f"[TTS] 🔊 Streamed: {filepath.name}")
+        return True
+    
     def generate_warning(
         self, 
         text: str, 
         filename: Optional[str] = None,
-        play_immediately: bool = True
+        play_immediately: bool = True,
+        priority: int = PRIORITY_NORMAL
     ) -> Optional[Path]:
         """
         Generate a warning audio file (NON-BLOCKING, QUEUE-BASED).
@@ -358,26 +981,63 @@ class TTSService:
             text: The text to convert to speech
             filename: Optional filename (without extension)
             play_immediately: Whether to play the audio after generation
+            priority: Queue priority, lower first (PRIORITY_VIOLATION, PRIORITY_NORMAL)
         
         Returns:
             None (runs async via queue)
         """
-        # Add request to the TTS queue (non-blocking)
-        try:
-            _tts_queue.put_nowait((text, filename, play_immediately, self))
-            print(f"[TTS] 🎤 Queued: {text[:50]}...")
-        except queue.Full:
-            print(f"[TTS] ⚠️ Queue full, dropping: {text[:30]}...")
-        
+        self._queue_request(text, filename, play_immediately, None, priority)
         return None  # Returns immediately, audio processed by worker
     
+    def generate_template_warning(
+        self,
+        template_key: str,
+        value: str,
+        play_immediately: bool = True,
+        priority: int = PRIORITY_NORMAL
+    ) -> None:
+        """
+        Queue a templated warning (NON-BLOCKING), e.g. a plate in "parking_move".
+        
+        Only the value is synthesized; the template's constant parts come
+        from the synthesis cache and are spliced around it.
+        
+        Args:
+            template_key: Key in WARNING_TEMPLATES
+            value: Text inserted into the template (plate, vehicle label, ...)
+            play_immediately: Whether to play the audio after generation
+            priority: Queue priority, lower first
+        """
+        text, segments = _template_segments(template_key, value)
+        self._queue_request(text, None, play_immediately, segments, priority)
+    
+    def _queue_request(
+        self,
+        text: str,
+        filename: Optional[str],
+        play_immediately: bool,
+        segments: Optional[Tuple[str, ...]],
+        priority: int = PRIORITY_NORMAL
+    ):
+        """Hand a request to the worker loop unless an identical one is pending."""
+        # Coalesce: one announcement per warning while it is pending or just played
+        if not _claim_request(_dedup_key(text, filename)):
+            return
+        
+        request = (text, filename, play_immediately, self, segments)
+        
+        if _post_to_tts_loop(_enqueue_request, request, priority):
+            print(f"[TTS] 🎤 Queued: {text[:50]}...")
+        else:
+            _release_request(request)
+            print(f"[TTS] ⚠️ TTS worker not running, dropping: {text[:30]}...")
+    
     def _generate_with_pyttsx3(self, text: str, filename: Optional[str] = None) -> Optional[Path]:
         """Generate audio file using pyttsx3 (cross-platform)."""
+        if not self._pyttsx3_available:
+            return None
+        
         try:
-            engine = self._get_pyttsx3_engine()
-            if engine is None:
-                return None
-            
             if filename is None:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
                 filename = f"warning_{timestamp}"
@@ -396,10 +1056,11 @@ class TTSService:
             filepath = WARNINGS_DIR / filename
             
             # pyttsx3 can save to file
-            engine.save_to_file(text, str(filepath))
-            engine.runAndWait()
+            def _save(engine):
+                engine.save_to_file(text, str(filepath))
+                engine.runAndWait()
             
-            if filepath.exists() and filepath.stat().st_size > 0:
+            if _get_pyttsx3_thread().submit(_save) and filepath.exists() and filepath.stat().st_size > 0:
                 print(f"[TTS] ✅ Generated (pyttsx3): {filepath.name}")
                 return filepath
             
@@ -411,15 +1072,9 @@ class TTSService:
     def _speak_pyttsx3_direct(self, text: str):
         """Speak directly using pyttsx3 without saving file."""
         try:
-            engine = self._get_pyttsx3_engine()
-            if engine:
-                # Run in a thread to not block
-                def _speak():
-                    engine.say(text)
-                    engine.runAndWait()
-                
-                thread = threading.Thread(target=_speak, daemon=True)
-                thread.start()
+            if self._pyttsx3_available:
+                # Queued on the engine thread, so this does not block
+                _get_pyttsx3_thread().submit(_speak_job(text), wait=False)
                 print(f"[TTS] 🔊 Speaking (pyttsx3): {text[:50]}...")
         except Exception as e:
             print(f"[TTS] pyttsx3 direct speak failed: {e}")
@@ -428,8 +1083,17 @@ class TTSService:
         """
         Play an audio file in the background.
         
+        Returns:
+            True if playback started successfully
+        """
+        return self._start_playback(filepath)[0]
+    
+    def _start_playback(self, filepath: Path) -> Tuple[bool, Optional[subprocess.Popen]]:
+        """
+        Start playing an audio file in the background.
+        
         Platform-specific implementation:
-        - Windows: Uses PowerShell MediaPlayer (auto-closes after playback)
+        - Windows: winsound for WAV (no process), PowerShell MediaPlayer otherwise
         - macOS: Uses 'afplay' (built-in, supports MP3/WAV/etc.)
         - Linux: Uses 'mpg123' or 'aplay'
         
@@ -437,16 +1101,25 @@ class TTSService:
             filepath: Path to the audio file
         
         Returns:
-            True if playback started successfully
+            (True if playback started, player process to wait on or None)
         """
         if not filepath or not filepath.exists():
             print(f"[TTS] ⚠️ Audio file not found: {filepath}")
-            return False
+            return False, None
         
         try:
+            proc = None
+            if winsound is not None and filepath.suffix == ".mp3":
+                # Play the WAV copy in-process when one was made
+                wav_path = filepath.with_suffix(".wav")
+                if wav_path.exists():
+                    filepath = wav_path
             filepath_str = str(filepath.absolute())
             
-            if sys.platform == "win32":
+            if winsound is not None and filepath.suffix == ".wav":
+                # Windows WAV: one async API call, no PowerShell cold start
+                winsound.PlaySound(filepath_str, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            elif sys.platform == "win32":
                 # Windows: Use PowerShell MediaPlayer which plays and exits cleanly
                 # This avoids the media player window staying open
                 ps_script = f'''
@@ -461,7 +1134,7 @@ class TTSService:
                 $player.Close()
                 '''
                 CREATE_NO_WINDOW = 0x08000000
-                subprocess.Popen(
+                proc = subprocess.Popen(
                     ['powershell', '-WindowStyle', 'Hidden', '-Command', ps_script],
                     creationflags=CREATE_NO_WINDOW,
                     stdout=subprocess.DEVNULL,
@@ -471,36 +1144,138 @@ class TTSService:
                 # macOS: Use afplay (built-in macOS audio player)
                 # afplay supports MP3, WAV, AAC, AIFF, etc.
                 # It blocks until playback finishes, which is fine in our worker thread
-                subprocess.Popen(
+                proc = subprocess.Popen(
                     ['afplay', filepath_str],
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
                 )
             else:
-                # Linux: Try multiple players in order of preference
+                # Linux: MP3 goes through the stdin player via sendfile when possible
+                if filepath.suffix == ".mp3":
+                    proc = self._sendfile_to_player(filepath)
+                
+                # Otherwise try multiple players in order of preference
                 players = [
                     ['mpg123', '-q', filepath_str],  # For MP3
                     ['aplay', filepath_str],          # For WAV
                     ['ffplay', '-nodisp', '-autoexit', filepath_str],  # FFmpeg player
                 ]
-                played = False
-                for player_cmd in players:
-                    try:
-                        subprocess.Popen(
-                            player_cmd,
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL
-                        )
-                        played = True
-                        break
-                    except FileNotFoundError:
-                        continue
+                played = proc is not None
+                if not played:
+                    for player_cmd in players:
+                        try:
+                            proc = subprocess.Popen(
+                                player_cmd,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL
+                            )
+                            played = True
+                            break
+                        except FileNotFoundError:
+                            continue
                 
                 if not played:
                     print(f"[TTS] ⚠️ No audio player found on Linux. Install mpg123, aplay, or ffplay.")
-                    return False
+                    return False, None
             
             print(f"[TTS] 🔊 Playing: {filepath.name}")
+            return True, proc
+            
+        except Exception as e:
+            print(f"[TTS] ❌ Error playing audio: {e}")
+            return False, None
+    
+    def _sendfile_to_player(self, filepath: Path) -> Optional[subprocess.Popen]:
+        """
+        Feed a file to the stdin player with os.sendfile (Linux).
+        
+        The file is read once, sequentially, so the kernel is told to read
+        ahead; the copy into the pipe never passes through Python buffers.
+        
+        Returns:
+            The player process, or None to fall back to a path-based player
+        """
+        if self._stream_player_cmd is None or not hasattr(os, "sendfile"):
+            return None
+        
+        try:
+            fd = os.open(str(filepath), os.O_RDONLY)
+        except OSError:
+            return None
+        
+        try:
+            size = os.fstat(fd).st_size
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            proc = subprocess.Popen(
+                self._stream_player_cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            os.close(fd)
+            return None
+        
+        def _feed():
+            # Blocks while the pipe is full, so it runs off the caller's thread
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(proc.stdin.fileno(), fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                pass  # Player exited early
+            finally:
+                os.close(fd)
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+        
+        threading.Thread(target=_feed, daemon=True).start()
+        return proc
+    
+    def _can_play_bytes(self, suffix: str) -> bool:
+        """True if audio with this extension can be played from memory here."""
+        if winsound is not None:
+            return suffix == ".wav"  # winsound SND_MEMORY only takes WAV
+        return suffix == ".mp3" and self._stream_player_cmd is not None
+    
+    def play_audio_bytes(self, buf: bytes) -> bool:
+        """
+        Play an in-memory audio buffer in the background.
+        
+        - Windows: winsound.PlaySound with SND_MEMORY (WAV only)
+        - macOS/Linux: piped to the stdin player (mpg123/ffplay, MP3)
+        
+        Returns:
+            True if playback started successfully
+        """
+        try:
+            if winsound is not None:
+                # SND_MEMORY cannot be combined with SND_ASYNC, so block a helper thread
+                threading.Thread(
+                    target=winsound.PlaySound,
+                    args=(buf, winsound.SND_MEMORY),
+                    daemon=True
+                ).start()
+            elif self._stream_player_cmd is not None:
+                proc = subprocess.Popen(
+                    self._stream_player_cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+                # Feed the pipe off-thread; a clip can be larger than the pipe buffer
+                threading.Thread(target=proc.communicate, args=(buf,), daemon=True).start()
+            else:
+                return False
+            
+            print(f"[TTS] 🔊 Playing from memory ({len(buf)} bytes)")
             return True
             
         except Exception as e:
@@ -535,23 +1310,23 @@ class TTSService:
         
         # Signal worker to stop
         _tts_worker_stop = True
-        try:
-            _tts_queue.put_nowait(None)  # Send shutdown signal
-        except:
-            pass
+        _post_to_tts_loop(_enqueue_request, None)  # Send shutdown signal
         
         if not WARNINGS_DIR.exists():
             return
         
         count = 0
-        for ext in ['*.mp3', '*.aiff', '*.wav']:
-            for f in WARNINGS_DIR.glob(ext):
-                try:
-                    f.unlink()
-                    count += 1
-                except:
-                    pass
+        with os.scandir(WARNINGS_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(AUDIO_EXTENSIONS) and entry.is_file():
+                    try:
+                        os.unlink(entry.path)
+                        count += 1
+                    except OSError:
+                        pass
         
+        self._warning_cache.clear()
+        self._dir_index_time = 0.0  # Rebuild the index on next lookup
         if count > 0:
             print(f"[TTS] 🧹 Cleaned up {count} audio files")
     
@@ -565,12 +1340,25 @@ class TTSService:
         if not WARNINGS_DIR.exists():
             return
         
-        files = sorted(WARNINGS_DIR.glob("*.mp3"), key=lambda f: f.stat().st_mtime)
+        # One scandir pass; DirEntry.stat() reuses what the listing returned where it can
+        with os.scandir(WARNINGS_DIR) as entries:
+            files = [
+                (entry.stat(follow_symlinks=False).st_mtime, entry.path)
+                for entry in entries
+                if entry.name.endswith(".mp3") and entry.is_file()
+            ]
+        files.sort()
         
         if len(files) > max_files:
             to_delete = files[:-max_files]
-            for f in to_delete:
-                f.unlink()
+            for _, path in to_delete:
+                os.unlink(path)
+            
+            # Forget cached lookups that pointed at deleted files
+            deleted = {path for _, path in to_delete}
+            for key in [k for k, f in self._warning_cache.items() if str(f) in deleted]:
+                del self._warning_cache[key]
+            self._dir_index_time = 0.0  # Rebuild the index on next lookup
             print(f"[TTS] 🧹 Cleaned up {len(to_delete)} old warning files")
 
 
@@ -6,9 +6,15 @@ Checks the SQLite database and TTS warnings to verify the system is working.
 import os
 import sys
 import sqlite3
+import argparse
+import heapq
+import importlib
+import time
 from pathlib import Path
 from datetime import datetime
 from app.config import get_settings
+from db_utils import open_conn
+from schema import EXPECTED_TABLES
 
 # Paths
 BACKEND_DIR = Path(__file__).parent
@@ -16,6 +22,12 @@ settings = get_settings()
 DB_PATH = settings.db_path
 TTS_WARNINGS_DIR = BACKEND_DIR / "app" / "tts" / "warnings"
 
+# Generated warning audio, matched on the lower-cased 4-character suffix
+AUDIO_EXTENSIONS = frozenset({".mp3", ".wav"})
+
+# Display format for stored epoch timestamps
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 def print_header(title: str):
     """Print a formatted header."""
@@ -24,8 +36,13 @@ def print_header(title: str):
     print("=" * 60)
 
 
-def check_database():
-    """Check the SQLite database for violations and driver scores."""
+def check_database(conn=None):
+    """
+    Check the SQLite database for violations and driver scores.
+    
+    Args:
+        conn: Open connection to reuse (--watch); opened and closed here if None
+    """
     print_header("DATABASE CHECK")
     
     if not DB_PATH.exists():
@@ -37,38 +54,44 @@ def check_database():
     print(f"   Size: {DB_PATH.stat().st_size / 1024:.1f} KB")
     
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        own_conn = conn is None
+        if own_conn:
+            # Read-only check: no write-path PRAGMAs
+            conn = open_conn(DB_PATH, pragmas=None)
         cursor = conn.cursor()
         
         # Get list of tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        print(f"\n📋 Tables in database: {[t[0] for t in tables]}")
+        table_names = conn.table_names()
+        print(f"\n📋 Tables in database: {sorted(table_names)}")
+        missing = [t for t in EXPECTED_TABLES if t not in table_names]
+        if missing:
+            print(f"⚠️ Missing tables: {missing}")
+            print("   Core tables are created at backend startup; run python migrate_db.py for the rest")
         
         # Check driver_violations table
         print_header("DRIVER VIOLATIONS (Last 5)")
         
         try:
-            # Query driver_violations
+            # Query driver_violations; SQLite formats epoch timestamps for display
             cursor.execute("""
-                SELECT * FROM driver_violations 
+                SELECT *,
+                       CASE WHEN typeof(timestamp) IN ('integer', 'real')
+                            THEN datetime(timestamp, 'unixepoch', 'localtime')
+                            ELSE timestamp END AS timestamp_fmt
+                FROM driver_violations 
                 ORDER BY timestamp DESC 
                 LIMIT 5
             """)
-            violations = cursor.fetchall()
+            violations = cursor.fetchmany(5)
             
             if violations:
-                # Get column names
-                cursor.execute("PRAGMA table_info(driver_violations)")
-                columns = [col[1] for col in cursor.fetchall()]
+                columns = violations[0].keys()[:-1]
                 print(f"   Columns: {columns}")
                 print()
                 
                 for i, row in enumerate(violations, 1):
-                    row_dict = dict(zip(columns, row))
-                    # Format timestamp for display
-                    if 'timestamp' in row_dict and isinstance(row_dict['timestamp'], (int, float)):
-                        row_dict['timestamp'] = datetime.fromtimestamp(row_dict['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+                    row_dict = dict(row)
+                    row_dict['timestamp'] = row_dict.pop('timestamp_fmt')
                     print(f"   [{i}] {row_dict}")
             else:
                 print("   No driver violations recorded yet.")
@@ -86,8 +109,8 @@ def check_database():
                     print(f"   Found {len(data)} records in 'violations'.")
                 else:
                     print("   'violations' table exists but is empty.")
-            except:
-                pass
+            except sqlite3.OperationalError as e:
+                print(f"   'violations' table unavailable: {e}")
         
         # Check drivers table
         print_header("DRIVERS / SCORES (Last 5)")
@@ -98,18 +121,18 @@ def check_database():
                 ORDER BY updated_at DESC 
                 LIMIT 5
             """)
-            drivers = cursor.fetchall()
+            drivers = cursor.fetchmany(5)
             
             if drivers:
-                cursor.execute("PRAGMA table_info(drivers)")
-                columns = [col[1] for col in cursor.fetchall()]
+                columns = drivers[0].keys()
                 print(f"   Columns: {columns}")
                 print()
                 
+                score_key = 'current_score' if 'current_score' in columns else 'score'
+                id_key = 'driver_id' if 'driver_id' in columns else 'id'
                 for i, row in enumerate(drivers, 1):
-                    data = dict(zip(columns, row))
-                    score = data.get('current_score', data.get('score', 'N/A'))
-                    driver_id = data.get('driver_id', data.get('id', 'Unknown'))
+                    score = row[score_key] if score_key in columns else 'N/A'
+                    driver_id = row[id_key] if id_key in columns else 'Unknown'
                     print(f"   [{i}] Driver: {driver_id} | Score: {score}")
             else:
                 print("   No driver records yet.")
@@ -119,34 +142,36 @@ def check_database():
         # Get statistics
         print_header("STATISTICS")
         
-        try:
-            cursor.execute("SELECT COUNT(*) FROM driver_violations")
-            violation_count = cursor.fetchone()[0]
-            print(f"   Total driver violations: {violation_count}")
-        except:
-             # Fallback
-            try:
-                cursor.execute("SELECT COUNT(*) FROM violations")
-                violation_count = cursor.fetchone()[0]
-                print(f"   Total 'raw' violations: {violation_count}")
-            except:
-                print("   Could not count violations")
-        
-        try:
-            cursor.execute("SELECT COUNT(*) FROM drivers")
-            driver_count = cursor.fetchone()[0]
-            print(f"   Total drivers: {driver_count}")
-        except:
+        # (label, COUNT query) for the tables present
+        stats = []
+        if "driver_violations" in table_names:
+            stats.append(("Total driver violations", "SELECT COUNT(*) FROM driver_violations"))
+        elif "violations" in table_names:
+            stats.append(("Total 'raw' violations", "SELECT COUNT(*) FROM violations"))
+        else:
+            print("   Could not count violations")
+        if "drivers" in table_names:
+            stats.append(("Total drivers", "SELECT COUNT(*) FROM drivers"))
+            # Served by the partial idx_drivers_penalized index from migrate_db.py
+            stats.append(("Penalized drivers (score < 100)", "SELECT COUNT(*) FROM drivers WHERE current_score < 100"))
+        else:
             print("   Could not count drivers")
         
+        # All counts in one statement; per-query only if one of them fails
         try:
-            cursor.execute("SELECT COUNT(*) FROM drivers WHERE current_score < 100")
-            penalized_count = cursor.fetchone()[0]
-            print(f"   Penalized drivers (score < 100): {penalized_count}")
-        except:
-            pass
+            combined = ", ".join(f"({sql})" for _, sql in stats)
+            counts = cursor.execute(f"SELECT {combined}").fetchone() if stats else ()
+            for (label, _), count in zip(stats, counts):
+                print(f"   {label}: {count}")
+        except sqlite3.OperationalError:
+            for label, sql in stats:
+                try:
+                    print(f"   {label}: {cursor.execute(sql).fetchone()[0]}")
+                except sqlite3.OperationalError as e:
+                    print(f"   {label}: n/a ({e})")
         
-        conn.close()
+        if own_conn:
+            conn.close()
         
     except Exception as e:
         print(f"❌ Error reading database: {e}")
@@ -164,28 +189,33 @@ def check_tts_warnings():
         print("   Run: python backend/app/tts/tts_service.py to test")
         return
     
-    # Count audio files
-    mp3_files = list(TTS_WARNINGS_DIR.glob("*.mp3"))
-    wav_files = list(TTS_WARNINGS_DIR.glob("*.wav"))
-    all_audio = mp3_files + wav_files
+    # One scandir pass; DirEntry.stat() is read once per file and reused
+    # and the extension is taken from the name with one suffix slice
+    all_audio = []
+    mp3_count = 0
+    with os.scandir(TTS_WARNINGS_DIR) as it:
+        for entry in it:
+            ext = entry.name[-4:].lower()
+            if ext in AUDIO_EXTENSIONS and entry.is_file():
+                all_audio.append((entry.name, entry.stat()))
+                mp3_count += ext == ".mp3"
     
     print(f"✅ Directory exists")
-    print(f"   MP3 files: {len(mp3_files)}")
-    print(f"   WAV files: {len(wav_files)}")
+    print(f"   MP3 files: {mp3_count}")
+    print(f"   WAV files: {len(all_audio) - mp3_count}")
     print(f"   Total audio files: {len(all_audio)}")
     
     if all_audio:
         print("\n   Recent files:")
-        # Sort by modification time, newest first
-        sorted_files = sorted(all_audio, key=lambda f: f.stat().st_mtime, reverse=True)
+        # Newest five by the cached mtime; no full sort or re-stat
+        recent = heapq.nlargest(5, all_audio, key=lambda f: f[1].st_mtime)
         
-        for f in sorted_files[:5]:
-            size = f.stat().st_size
-            mtime = datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-            print(f"      - {f.name} ({size} bytes) [{mtime}]")
+        for name, st in recent:
+            mtime = datetime.fromtimestamp(st.st_mtime).strftime(TIMESTAMP_FORMAT)
+            print(f"      - {name} ({st.st_size} bytes) [{mtime}]")
         
-        if len(sorted_files) > 5:
-            print(f"      ... and {len(sorted_files) - 5} more files")
+        if len(all_audio) > 5:
+            print(f"      ... and {len(all_audio) - 5} more files")
     else:
         print("\n   No audio files generated yet.")
         print("   Trigger a parking warning to generate audio.")
@@ -195,11 +225,16 @@ def check_scoring_engine():
     """Check if the scoring engine is working in memory."""
     print_header("SCORING ENGINE (In-Memory)")
     
+    if not DB_PATH.exists():
+        print("⏭️ Skipped: no database, so no driver scores to load.")
+        return
+    
     try:
+        # Imported on demand; app.scoring pulls in the wider app package
         sys.path.insert(0, str(BACKEND_DIR))
-        from app.scoring import get_scoring_engine
+        scoring = importlib.import_module("app.scoring")
         
-        engine = get_scoring_engine()
+        engine = scoring.get_scoring_engine()
         
         print(f"✅ Scoring engine loaded")
         print(f"   Initial score setting: {engine.initial_score}")
@@ -217,16 +252,52 @@ def check_scoring_engine():
         print(f"⚠️ Could not load scoring engine: {e}")
 
 
+def watch(args):
+    """Re-run the DB and TTS checks until Ctrl+C, keeping one DB connection open."""
+    conn = None
+    if not args.skip_db and DB_PATH.exists():
+        conn = open_conn(DB_PATH, pragmas=None)
+    
+    try:
+        while True:
+            time.sleep(args.watch)
+            print(f"\n🔄 {datetime.now().strftime(TIMESTAMP_FORMAT)}")
+            if not args.skip_db:
+                check_database(conn)
+            if not args.skip_tts:
+                check_tts_warnings()
+    except KeyboardInterrupt:
+        print("\n⏹️ Stopped watching.")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
 def main():
     """Run all checks."""
+    parser = argparse.ArgumentParser(description="Verify the database and TTS warnings")
+    parser.add_argument("--skip-db", action="store_true", help="Skip the database check")
+    parser.add_argument("--skip-tts", action="store_true", help="Skip the TTS warnings check")
+    parser.add_argument("--skip-engine", action="store_true", help="Skip loading the scoring engine")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="Repeat the DB and TTS checks every SECONDS on one connection")
+    args = parser.parse_args()
+    
     print("\n" + "🔍" * 30)
     print("  INTELLIGENT TRAFFIC MANAGEMENT SYSTEM")
     print("  Database & TTS Verification Script")
     print("🔍" * 30)
     
-    check_database()
-    check_tts_warnings()
-    check_scoring_engine()
+    if not args.skip_db:
+        check_database()
+    if not args.skip_tts:
+        check_tts_warnings()
+    if not args.skip_engine:
+        check_scoring_engine()
+    
+    if args.watch:
+        watch(args)
+        return
     
     print_header("SUMMARY")
     print("""
@@ -0,0 +1,57 @@
+"""
+Shared SQLite helpers for the maintenance scripts (check_db, fix_db, migrate_db).
+
+Usage:
+    from db_utils import open_conn
+
+    conn = open_conn(DB_PATH)
+    tables = conn.table_names()
+    columns = conn.table_columns("drivers")
+"""
+
+import sqlite3
+
+# Write-path settings; journal_mode=WAL persists, so app connections inherit it
+PERFORMANCE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+"""
+
+
+class CheckedConnection(sqlite3.Connection):
+    """sqlite3 connection that caches PRAGMA table_info per table."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._columns = {}
+    
+    def table_names(self) -> set:
+        """Names of all tables currently in the database."""
+        rows = self.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        return {row[0] for row in rows}
+    
+    def table_columns(self, table: str) -> list:
+        """Column names of a table (empty if it doesn't exist), read once per connection."""
+        if table not in self._columns:
+            rows = self.execute(f"PRAGMA table_info({table})").fetchall()
+            self._columns[table] = [row[1] for row in rows]
+        return self._columns[table]
+
+
+def open_conn(path, pragmas: str = PERFORMANCE_PRAGMAS, **connect_kwargs) -> CheckedConnection:
+    """
+    Open a CheckedConnection with sqlite3.Row rows.
+    
+    Args:
+        path: Database file
+        pragmas: PRAGMA script applied once on open (None for read-only checks)
+        **connect_kwargs: Passed to sqlite3.connect (e.g. isolation_level=None)
+    """
+    conn = sqlite3.connect(str(path), factory=CheckedConnection, **connect_kwargs)
+    if pragmas:
+        conn.executescript(pragmas)
+    conn.row_factory = sqlite3.Row
+    return conn
@@ -22,313 +22,99 @@ Tables Added:
 - driver_notifications (Push Notifications)
 """
 
-import sqlite3
 import os
 from pathlib import Path
 from datetime import datetime
 
+from db_utils import open_conn
+from schema import SCHEMA_SECTIONS, SCHEMA_SQL
+
 # Database path
 DB_PATH = Path(__file__).parent / "traffic.db"
 
 
-def get_connection():
-    """Get database connection."""
-    return sqlite3.connect(str(DB_PATH))
-
-
-def table_exists(cursor, table_name: str) -> bool:
-    """Check if a table exists in the database."""
-    cursor.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table_name,)
-    )
-    return cursor.fetchone() is not None
+# ============================================================================
+# INDEXES & SEEDS
+# ============================================================================
+
+# Indexes on tables owned by the app (app/db/database.py) or fix_db.py, as
+# (table, required columns, DDL); added only when the table has those columns
+APP_TABLE_INDEXES = [
+    # Latest-violations listings: ORDER BY timestamp DESC LIMIT n
+    ("driver_violations", ("timestamp",),
+     "CREATE INDEX IF NOT EXISTS idx_driver_violations_ts ON driver_violations(timestamp DESC);"),
+    # Recently updated drivers (app schema uses updated_at, fix_db.py last_updated)
+    ("drivers", ("updated_at",),
+     "CREATE INDEX IF NOT EXISTS idx_drivers_updated ON drivers(updated_at DESC);"),
+    ("drivers", ("last_updated",),
+     "CREATE INDEX IF NOT EXISTS idx_drivers_last_updated ON drivers(last_updated DESC);"),
+    # Partial index: only penalized drivers, so it stays small
+    ("drivers", ("current_score",),
+     "CREATE INDEX IF NOT EXISTS idx_drivers_penalized ON drivers(current_score) WHERE current_score < 100;"),
+]
+
+# Seeds run on every migration and are idempotent; the NOT EXISTS guard
+# covers junction_safety tables created before junction_id was UNIQUE
+SEED_ROWS = {
+    "junction_safety": (
+        "INSERT OR IGNORE INTO junction_safety (junction_id, safety_score) "
+        "SELECT ?1, ?2 WHERE NOT EXISTS (SELECT 1 FROM junction_safety WHERE junction_id = ?1)",
+        [("main", 100)],
+        "with default junction",
+    ),
+    # Default admin user (password: admin123)
+    # In production, use proper password hashing!
+    "admin_users": (
+        "INSERT OR IGNORE INTO admin_users (username, password_hash, role) VALUES (?, ?, ?)",
+        [("admin", "admin123", "admin")],
+        "with default admin",
+    ),
+}
 
 
-def create_member1_tables(cursor):
-    """
-    Member 1: Dynamic Fines & Parking Violations
-    - dynamic_fines: Stores calculated fines with breakdown
-    - grace_period_warnings: Tracks pre-violation warnings
+def get_connection():
     """
+    Get database connection (WAL, synchronous=NORMAL, in-memory temp, 64 MB cache, mmap).
     
-    # Dynamic Fines Table
-    if not table_exists(cursor, 'dynamic_fines'):
-        cursor.execute("""
-            CREATE TABLE dynamic_fines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                violation_id INTEGER NOT NULL,
-                zone_type TEXT NOT NULL,
-                base_penalty REAL NOT NULL,
-                duration_seconds INTEGER NOT NULL,
-                duration_penalty REAL NOT NULL,
-                traffic_impact INTEGER NOT NULL,
-                impact_penalty REAL NOT NULL,
-                total_fine REAL NOT NULL,
-                payment_status TEXT DEFAULT 'unpaid',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (violation_id) REFERENCES violations(id)
-            )
-        """)
-        print("[OK] Created table: dynamic_fines")
-    else:
-        print("[SKIP] Table already exists: dynamic_fines")
-    
-    # Grace Period Warnings Table
-    if not table_exists(cursor, 'grace_period_warnings'):
-        cursor.execute("""
-            CREATE TABLE grace_period_warnings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vehicle_id INTEGER NOT NULL,
-                plate_number TEXT,
-                zone_type TEXT NOT NULL,
-                warning_start TIMESTAMP NOT NULL,
-                warning_level INTEGER DEFAULT 1,
-                vehicle_moved BOOLEAN DEFAULT FALSE,
-                violation_recorded BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: grace_period_warnings")
-    else:
-        print("[SKIP] Table already exists: grace_period_warnings")
+    Autocommit mode: the migration manages its own BEGIN IMMEDIATE/COMMIT.
+    """
+    return open_conn(DB_PATH, isolation_level=None)
 
 
-def create_member2_tables(cursor):
-    """
-    Member 2: Junction Safety Scoring
-    - junction_safety: LiveSafeScore data
-    - lane_weaving_events: Detected weaving incidents
-    - community_alerts: Anonymized community notifications
-    """
-    
-    # Junction Safety Table
-    if not table_exists(cursor, 'junction_safety'):
-        cursor.execute("""
-            CREATE TABLE junction_safety (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                junction_id TEXT NOT NULL DEFAULT 'main',
-                safety_score INTEGER NOT NULL CHECK(safety_score >= 0 AND safety_score <= 100),
-                last_violation_type TEXT,
-                last_violation_severity INTEGER,
-                violations_last_hour INTEGER DEFAULT 0,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        # Insert default junction
-        cursor.execute("""
-            INSERT INTO junction_safety (junction_id, safety_score) VALUES ('main', 100)
-        """)
-        print("[OK] Created table: junction_safety (with default junction)")
-    else:
-        print("[SKIP] Table already exists: junction_safety")
-    
-    # Lane Weaving Events Table
-    if not table_exists(cursor, 'lane_weaving_events'):
-        cursor.execute("""
-            CREATE TABLE lane_weaving_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vehicle_id INTEGER NOT NULL,
-                plate_number TEXT,
-                avg_x_velocity REAL NOT NULL,
-                direction_changes INTEGER NOT NULL,
-                duration_frames INTEGER NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: lane_weaving_events")
-    else:
-        print("[SKIP] Table already exists: lane_weaving_events")
-    
-    # Community Alerts Table
-    if not table_exists(cursor, 'community_alerts'):
-        cursor.execute("""
-            CREATE TABLE community_alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                junction_id TEXT NOT NULL,
-                alert_type TEXT NOT NULL,
-                message TEXT NOT NULL,
-                safety_score_at_time INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: community_alerts")
-    else:
-        print("[SKIP] Table already exists: community_alerts")
+def app_index_sql(conn, existing_tables) -> list:
+    """APP_TABLE_INDEXES statements whose table and columns exist."""
+    return [
+        sql for table, required, sql in APP_TABLE_INDEXES
+        if table in existing_tables
+        and all(col in conn.table_columns(table) for col in required)
+    ]
 
 
-def create_member3_tables(cursor):
-    """
-    Member 3: Adaptive Traffic Signals
-    - emergency_overrides: Logs emergency mode activations
-    - signal_timing_history: Fuzzy logic decision history
-    """
-    
-    # Emergency Overrides Table
-    if not table_exists(cursor, 'emergency_overrides'):
-        cursor.execute("""
-            CREATE TABLE emergency_overrides (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vehicle_type TEXT NOT NULL,
-                trigger_type TEXT NOT NULL,
-                lane TEXT NOT NULL DEFAULT 'north',
-                override_start TIMESTAMP NOT NULL,
-                override_end TIMESTAMP,
-                duration_seconds INTEGER,
-                signal_state_before TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: emergency_overrides")
-    else:
-        print("[SKIP] Table already exists: emergency_overrides")
-    
-    # Signal Timing History Table
-    if not table_exists(cursor, 'signal_timing_history'):
-        cursor.execute("""
-            CREATE TABLE signal_timing_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lane TEXT NOT NULL,
-                vehicle_count INTEGER NOT NULL,
-                traffic_level TEXT NOT NULL,
-                green_duration INTEGER NOT NULL,
-                yellow_duration INTEGER NOT NULL DEFAULT 3,
-                red_duration INTEGER NOT NULL,
-                emergency_mode BOOLEAN DEFAULT FALSE,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: signal_timing_history")
-    else:
-        print("[SKIP] Table already exists: signal_timing_history")
+def build_migration_script(extra_sql=()) -> str:
+    """Schema plus extra statements; opens the migration transaction, the caller commits."""
+    # IMMEDIATE takes the write lock up front instead of upgrading mid-script
+    return "BEGIN IMMEDIATE;\n" + SCHEMA_SQL + "\n".join(extra_sql) + "\n"
 
 
-def create_member4_tables(cursor):
-    """
-    Member 4: Accident Risk Prediction
-    - risk_scores: Vehicle risk score calculations
-    - abnormal_behavior_log: Detected dangerous behaviors
-    - incident_reports: Auto-generated incident records
-    """
-    
-    # Risk Scores Table
-    if not table_exists(cursor, 'risk_scores'):
-        cursor.execute("""
-            CREATE TABLE risk_scores (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vehicle_id INTEGER NOT NULL,
-                plate_number TEXT,
-                risk_score REAL NOT NULL CHECK(risk_score >= 0 AND risk_score <= 100),
-                speed_factor REAL NOT NULL,
-                violation_history_factor REAL NOT NULL,
-                risk_level TEXT NOT NULL,
-                current_speed REAL,
-                speed_limit REAL DEFAULT 60.0,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: risk_scores")
-    else:
-        print("[SKIP] Table already exists: risk_scores")
-    
-    # Abnormal Behavior Log Table
-    if not table_exists(cursor, 'abnormal_behavior_log'):
-        cursor.execute("""
-            CREATE TABLE abnormal_behavior_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vehicle_id INTEGER NOT NULL,
-                plate_number TEXT,
-                behavior_type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                details TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: abnormal_behavior_log")
-    else:
-        print("[SKIP] Table already exists: abnormal_behavior_log")
-    
-    # Incident Reports Table
-    if not table_exists(cursor, 'incident_reports'):
-        cursor.execute("""
-            CREATE TABLE incident_reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                incident_type TEXT NOT NULL,
-                risk_score_at_time REAL,
-                vehicles_involved TEXT,
-                description TEXT,
-                evidence_path TEXT,
-                auto_generated BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: incident_reports")
-    else:
-        print("[SKIP] Table already exists: incident_reports")
+def seed_tables(cursor):
+    """Insert any missing SEED_ROWS, one executemany per table."""
+    for sql, rows, _ in SEED_ROWS.values():
+        cursor.executemany(sql, rows)
 
 
-def create_user_tables(cursor):
-    """
-    User Authentication Tables for Flutter Apps
-    - admin_users: Web dashboard authentication
-    - driver_users: Mobile app authentication
-    - driver_notifications: Push notification queue
-    """
-    
-    # Admin Users Table
-    if not table_exists(cursor, 'admin_users'):
-        cursor.execute("""
-            CREATE TABLE admin_users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT DEFAULT 'admin',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        # Insert default admin user (password: admin123)
-        # In production, use proper password hashing!
-        cursor.execute("""
-            INSERT INTO admin_users (username, password_hash, role) 
-            VALUES ('admin', 'admin123', 'admin')
-        """)
-        print("[OK] Created table: admin_users (with default admin)")
-    else:
-        print("[SKIP] Table already exists: admin_users")
-    
-    # Driver Users Table
-    if not table_exists(cursor, 'driver_users'):
-        cursor.execute("""
-            CREATE TABLE driver_users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                phone_number TEXT UNIQUE NOT NULL,
-                name TEXT,
-                license_number TEXT,
-                vehicle_plates TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("[OK] Created table: driver_users")
-    else:
-        print("[SKIP] Table already exists: driver_users")
-    
-    # Driver Notifications Table
-    if not table_exists(cursor, 'driver_notifications'):
-        cursor.execute("""
-            CREATE TABLE driver_notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                driver_id INTEGER NOT NULL,
-                notification_type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                message TEXT NOT NULL,
-                read BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (driver_id) REFERENCES driver_users(id)
-            )
-        """)
-        print("[OK] Created table: driver_notifications")
-    else:
-        print("[SKIP] Table already exists: driver_notifications")
+def report_tables(existing_tables, final_tables):
+    """Print [OK]/[SKIP] per table by diffing the table lists around the migration."""
+    for title, tables in SCHEMA_SECTIONS:
+        print("-" * 60)
+        print(title)
+        print("-" * 60)
+        for table in tables:
+            if table in existing_tables:
+                print(f"[SKIP] Table already exists: {table}")
+            elif table in final_tables:
+                note = f" ({SEED_ROWS[table][2]})" if table in SEED_ROWS else ""
+                print(f"[OK] Created table: {table}{note}")
+        print()
 
 
 def run_migration():
@@ -348,47 +134,26 @@ def run_migration():
     
     try:
         # Check existing tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        existing_tables = [row[0] for row in cursor.fetchall()]
-        print(f"Existing tables: {existing_tables}\n")
+        existing_tables = conn.table_names()
+        print(f"Existing tables: {sorted(existing_tables)}\n")
         
-        print("-" * 60)
-        print("MEMBER 1: Dynamic Fines & Parking Violations")
-        print("-" * 60)
-        create_member1_tables(cursor)
+        # DDL, indexes and seeds in one write transaction
+        index_sql = app_index_sql(conn, existing_tables)
+        conn.executescript(build_migration_script(index_sql))
+        seed_tables(cursor)
+        cursor.execute("COMMIT")
+        if index_sql:
+            print(f"[OK] Ensured {len(index_sql)} index(es) on app tables\n")
         
-        print()
-        print("-" * 60)
-        print("MEMBER 2: Junction Safety Scoring")
-        print("-" * 60)
-        create_member2_tables(cursor)
-        
-        print()
-        print("-" * 60)
-        print("MEMBER 3: Adaptive Traffic Signals")
-        print("-" * 60)
-        create_member3_tables(cursor)
-        
-        print()
-        print("-" * 60)
-        print("MEMBER 4: Accident Risk Prediction")
-        print("-" * 60)
-        create_member4_tables(cursor)
-        
-        print()
-        print("-" * 60)
-        print("USER AUTHENTICATION TABLES")
-        print("-" * 60)
-        create_user_tables(cursor)
-        
-        # Commit all changes
-        conn.commit()
+        # Refresh planner statistics for the new/changed tables
+        cursor.execute("PRAGMA optimize")
         
         # Show final table list
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
         final_tables = [row[0] for row in cursor.fetchall()]
         
-        print()
+        report_tables(existing_tables, set(final_tables))
+        
         print("=" * 60)
         print("MIGRATION COMPLETE")
         print("=" * 60)
@@ -399,7 +164,8 @@ def run_migration():
         
     except Exception as e:
         print(f"\n[ERROR] Migration failed: {e}")
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         raise
     
     finally:
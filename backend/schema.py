@@ -0,0 +1,225 @@
+"""
+Canonical SQLite Schema for the Backend Maintenance Scripts
+============================================================
+Single source of the table definitions used by migrate_db.py, fix_db.py and
+check_db.py. Every statement is CREATE ... IF NOT EXISTS, so any of the
+scripts can be run via executescript() repeatedly.
+
+Scripts:
+    MEMBER_SCHEMA_SQL - feature tables for Members 1-4 (migrate_db.py)
+    USER_SCHEMA_SQL   - Flutter app login tables (migrate_db.py, fix_db.py)
+    CORE_SCHEMA_SQL   - drivers/violations repaired by fix_db.py
+    SCHEMA_SQL        - MEMBER_SCHEMA_SQL + USER_SCHEMA_SQL
+"""
+
+# Tables created by migrate_db.py, grouped for its progress report
+SCHEMA_SECTIONS = [
+    ("MEMBER 1: Dynamic Fines & Parking Violations",
+     ["dynamic_fines", "grace_period_warnings"]),
+    ("MEMBER 2: Junction Safety Scoring",
+     ["junction_safety", "lane_weaving_events", "community_alerts"]),
+    ("MEMBER 3: Adaptive Traffic Signals",
+     ["emergency_overrides", "signal_timing_history"]),
+    ("MEMBER 4: Accident Risk Prediction",
+     ["risk_scores", "abnormal_behavior_log", "incident_reports"]),
+    ("USER AUTHENTICATION TABLES",
+     ["admin_users", "driver_users", "driver_notifications"]),
+]
+
+# Feature tables added by migrate_db.py
+MEMBER_SCHEMA_SQL = """
+-- Member 1: Dynamic Fines & Parking Violations
+CREATE TABLE IF NOT EXISTS dynamic_fines (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    violation_id INTEGER NOT NULL,
+    zone_type TEXT NOT NULL,
+    base_penalty REAL NOT NULL,
+    duration_seconds INTEGER NOT NULL,
+    duration_penalty REAL NOT NULL,
+    traffic_impact INTEGER NOT NULL,
+    impact_penalty REAL NOT NULL,
+    total_fine REAL NOT NULL,
+    payment_status TEXT DEFAULT 'unpaid',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (violation_id) REFERENCES violations(id)
+);
+
+CREATE TABLE IF NOT EXISTS grace_period_warnings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id INTEGER NOT NULL,
+    plate_number TEXT,
+    zone_type TEXT NOT NULL,
+    warning_start TIMESTAMP NOT NULL,
+    warning_level INTEGER DEFAULT 1,
+    vehicle_moved BOOLEAN DEFAULT FALSE,
+    violation_recorded BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Member 2: Junction Safety Scoring
+-- One row per junction, stored directly in the junction_id B-tree
+CREATE TABLE IF NOT EXISTS junction_safety (
+    id INTEGER,
+    junction_id TEXT PRIMARY KEY NOT NULL DEFAULT 'main',
+    safety_score INTEGER NOT NULL CHECK(safety_score >= 0 AND safety_score <= 100),
+    last_violation_type TEXT,
+    last_violation_severity INTEGER,
+    violations_last_hour INTEGER DEFAULT 0 CHECK(violations_last_hour >= 0),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS lane_weaving_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id INTEGER NOT NULL,
+    plate_number TEXT,
+    avg_x_velocity REAL NOT NULL,
+    direction_changes INTEGER NOT NULL,
+    duration_frames INTEGER NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS community_alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    junction_id TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    safety_score_at_time INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Member 3: Adaptive Traffic Signals
+CREATE TABLE IF NOT EXISTS emergency_overrides (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_type TEXT NOT NULL,
+    trigger_type TEXT NOT NULL,
+    lane TEXT NOT NULL DEFAULT 'north',
+    override_start TIMESTAMP NOT NULL,
+    override_end TIMESTAMP,
+    duration_seconds INTEGER,
+    signal_state_before TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS signal_timing_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lane TEXT NOT NULL,
+    vehicle_count INTEGER NOT NULL,
+    traffic_level TEXT NOT NULL,
+    green_duration INTEGER NOT NULL,
+    yellow_duration INTEGER NOT NULL DEFAULT 3,
+    red_duration INTEGER NOT NULL,
+    emergency_mode BOOLEAN DEFAULT FALSE,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Member 4: Accident Risk Prediction
+CREATE TABLE IF NOT EXISTS risk_scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id INTEGER NOT NULL,
+    plate_number TEXT,
+    risk_score REAL NOT NULL CHECK(risk_score >= 0 AND risk_score <= 100),
+    speed_factor REAL NOT NULL,
+    violation_history_factor REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    current_speed REAL,
+    speed_limit REAL DEFAULT 60.0,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Lookback queries filter by vehicle or plate and a time window
+CREATE INDEX IF NOT EXISTS idx_risk_vehicle_ts ON risk_scores(vehicle_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_risk_plate_ts ON risk_scores(plate_number, timestamp DESC);
+
+CREATE TABLE IF NOT EXISTS abnormal_behavior_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id INTEGER NOT NULL,
+    plate_number TEXT,
+    behavior_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    details TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS incident_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    incident_type TEXT NOT NULL,
+    risk_score_at_time REAL,
+    vehicles_involved TEXT,
+    description TEXT,
+    evidence_path TEXT,
+    auto_generated BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Login tables, matching the columns app/routers/auth.py reads and writes
+USER_SCHEMA_SQL = """
+-- User Authentication Tables for Flutter Apps
+CREATE TABLE IF NOT EXISTS admin_users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    role TEXT DEFAULT 'admin',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS driver_users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    plate_number TEXT,
+    name TEXT,
+    license_number TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS driver_notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    driver_id INTEGER NOT NULL,
+    notification_type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    read BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (driver_id) REFERENCES driver_users(id)
+);
+
+-- Unread notifications per driver
+CREATE INDEX IF NOT EXISTS idx_notif_driver ON driver_notifications(driver_id, read);
+"""
+
+# Driver scoring tables repaired by fix_db.py; drivers matches app/db/database.py
+CORE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS drivers (
+    driver_id TEXT PRIMARY KEY,
+    current_score INTEGER DEFAULT 100,
+    total_violations INTEGER DEFAULT 0,
+    total_fines REAL DEFAULT 0.0,
+    created_at REAL,
+    updated_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    driver_id TEXT,
+    violation_type TEXT,
+    severity INTEGER DEFAULT 1,
+    fine_amount REAL DEFAULT 0,
+    location TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    image_path TEXT,
+    video_path TEXT,
+    processed INTEGER DEFAULT 0,
+    FOREIGN KEY (driver_id) REFERENCES drivers(driver_id)
+);
+"""
+
+SCHEMA_SQL = MEMBER_SCHEMA_SQL + USER_SCHEMA_SQL
+
+# Every table the backend expects, for check_db.py
+EXPECTED_TABLES = [
+    "drivers", "driver_violations", "violations",
+    *(table for _, tables in SCHEMA_SECTIONS for table in tables),
+]